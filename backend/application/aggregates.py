@@ -0,0 +1,108 @@
+"""
+Application Layer - Agregados financeiros acumulados incrementalmente.
+Permite calcular resumos sem manter todas as transações em memória.
+"""
+
+import hashlib
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Optional
+
+from domain.money import para_centavos
+
+
+# Dimensões e medidas do cubo de agregados (valores em centavos, int64)
+DIMENSOES_CUBO = ['Mes_Ano', 'Categoria', 'Tipo']
+AGREGACOES_CUBO = {
+    'Entrada': 'sum',
+    'Saida': 'sum',
+    'Num': 'sum',
+    'Maior_Entrada': 'max',
+    'Maior_Saida': 'max',
+}
+
+
+def _cubo_vazio() -> pd.DataFrame:
+    """Cria um cubo sem células."""
+    indice = pd.MultiIndex.from_tuples([], names=DIMENSOES_CUBO)
+    return pd.DataFrame(
+        {coluna: pd.Series(dtype='int64') for coluna in AGREGACOES_CUBO},
+        index=indice
+    )
+
+
+@dataclass
+class AgregadosFinanceiros:
+    """
+    Agregados do extrato, atualizados bloco a bloco.
+
+    Além dos totais gerais, mantém um cubo mês × categoria × tipo com
+    somas, contagens e máximos, suficiente para os resumos do serviço.
+    Os valores são inteiros em centavos, então as somas são exatas.
+    """
+    num_transacoes: int = 0
+    total_entradas_centavos: int = 0
+    total_saidas_centavos: int = 0
+    maior_gasto_centavos: int = 0
+    maior_entrada_centavos: int = 0
+    data_inicio: Optional[pd.Timestamp] = None
+    data_fim: Optional[pd.Timestamp] = None
+    saldo_final_centavos: int = 0
+    cubo: pd.DataFrame = field(default_factory=_cubo_vazio)
+
+    def acumular(self, df: pd.DataFrame) -> None:
+        """
+        Incorpora um bloco de transações (formato de análise) aos agregados.
+
+        Args:
+            df: Bloco com as colunas Data, Entrada, Saida, Saldo, Mes_Ano, Categoria e Tipo
+        """
+        if df.empty:
+            return
+
+        entradas = para_centavos(df['Entrada'])
+        saidas = para_centavos(df['Saida'])
+
+        self.num_transacoes += len(df)
+        self.total_entradas_centavos += int(entradas.sum())
+        self.total_saidas_centavos += int(saidas.sum())
+        self.maior_gasto_centavos = max(self.maior_gasto_centavos, int(saidas.max()))
+        self.maior_entrada_centavos = max(self.maior_entrada_centavos, int(entradas.max()))
+
+        data_min = df['Data'].min()
+        data_max = df['Data'].max()
+        if self.data_inicio is None or data_min < self.data_inicio:
+            self.data_inicio = data_min
+
+        # Saldo real = saldo da última transação (na ordem do arquivo) da data mais recente
+        if self.data_fim is None or data_max >= self.data_fim:
+            self.data_fim = data_max
+            self.saldo_final_centavos = int(para_centavos(df.loc[df['Data'] == data_max, 'Saldo'].iloc[-1:])[0])
+
+        valores = df[DIMENSOES_CUBO].assign(Entrada=entradas, Saida=saidas)
+        parcial = valores.groupby(DIMENSOES_CUBO, observed=True).agg(
+            Entrada=('Entrada', 'sum'),
+            Saida=('Saida', 'sum'),
+            Num=('Entrada', 'size'),
+            Maior_Entrada=('Entrada', 'max'),
+            Maior_Saida=('Saida', 'max'),
+        )
+        if self.cubo.empty:
+            self.cubo = parcial
+        else:
+            self.cubo = (
+                pd.concat([self.cubo, parcial])
+                .groupby(level=DIMENSOES_CUBO, observed=True)
+                .agg(AGREGACOES_CUBO)
+            )
+
+    def assinatura(self) -> str:
+        """Hash do conteúdo dos agregados; muda sempre que os dados mudam."""
+        digest = hashlib.sha256()
+        digest.update(repr((
+            self.num_transacoes, self.total_entradas_centavos, self.total_saidas_centavos,
+            self.maior_gasto_centavos, self.maior_entrada_centavos, str(self.data_inicio),
+            str(self.data_fim), self.saldo_final_centavos
+        )).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(self.cubo, index=True).to_numpy().tobytes())
+        return digest.hexdigest()[:16]
@@ -0,0 +1,168 @@
+"""
+Application Layer - Cache de respostas do chat.
+Perguntas repetidas (mesmo total do mês, mesma categoria) são respondidas
+sem rodar o agente de novo, enquanto os dados do extrato não mudarem.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+
+from application.intent_router import MESES, normalizar_pergunta
+
+
+# Palavras que não mudam o sentido da pergunta
+STOPWORDS = frozenset("""
+    a o as os um uma uns umas e de do da dos das em no na nos nas com para pra por pelo pela
+    ao aos que qual quais eu meu minha meus minhas me mim voce seu sua se isso esse essa este esta
+    foi sao ser tem favor poderia pode consegue diga dizer mostre mostra mostrar quero saber gostaria
+    oi ola cfo agora entao ai la
+""".split())
+
+# Tokens que, se diferentes, mudam a resposta mesmo em perguntas parecidas
+_RE_TOKEN_EXATO = re.compile(r'^(\d+|\d+[/-]\d+|' + '|'.join(MESES) + r')$')
+
+
+class CacheRespostas:
+    """
+    Cache LRU com expiração das respostas do agente, indexado pela pergunta
+    normalizada (sem acentos, minúscula, sem stopwords).
+
+    Opcionalmente aceita perguntas parecidas: se nenhuma chave for igual,
+    procura a pergunta em cache mais próxima por similaridade de cosseno
+    entre os vetores de palavras, exigindo os mesmos números e meses.
+
+    Todas as entradas pertencem a uma versão dos dados e o cache é
+    esvaziado quando essa versão muda.
+    """
+
+    def __init__(self, capacidade: int = 1000, ttl_segundos: float = 3600,
+                 limiar_similaridade: Optional[float] = None):
+        """
+        Inicializa o cache.
+
+        Args:
+            capacidade: Número máximo de respostas mantidas
+            ttl_segundos: Tempo de vida de cada resposta
+            limiar_similaridade: Similaridade mínima (0 a 1) para reaproveitar a
+                resposta de uma pergunta parecida; None aceita só perguntas iguais
+        """
+        self.capacidade = capacidade
+        self.ttl_segundos = ttl_segundos
+        self.limiar_similaridade = limiar_similaridade
+        self.versao: Optional[str] = None
+        self.hits = 0
+        self.hits_similares = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expiradas = 0
+        self._itens: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chave(pergunta: str) -> str:
+        """Normaliza a pergunta: sem acentos, minúscula, sem pontuação nem stopwords."""
+        palavras = normalizar_pergunta(pergunta).split()
+        return ' '.join(palavra for palavra in palavras if palavra not in STOPWORDS)
+
+    def garantir_versao(self, versao: str) -> None:
+        """Esvazia o cache se os dados mudaram."""
+        if self.versao == versao:
+            return
+        with self._lock:
+            if self.versao != versao:
+                self._itens.clear()
+                self.versao = versao
+
+    def obter(self, pergunta: str, versao: str) -> Optional[str]:
+        """Retorna a resposta em cache para a pergunta, ou None."""
+        self.garantir_versao(versao)
+        chave = self.chave(pergunta)
+        agora = time.monotonic()
+
+        with self._lock:
+            self._remover_expiradas(agora)
+
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+                self.hits += 1
+                return item[1]
+
+            similar = self._buscar_similar(chave)
+            if similar is not None:
+                self._itens.move_to_end(similar)
+                self.hits_similares += 1
+                return self._itens[similar][1]
+
+            self.misses += 1
+            return None
+
+    def guardar(self, pergunta: str, versao: str, resposta: str) -> None:
+        """Guarda a resposta, se ainda for da versão atual dos dados."""
+        chave = self.chave(pergunta)
+        if not chave:
+            return
+        with self._lock:
+            if versao != self.versao:
+                return
+            self._itens[chave] = (time.monotonic() + self.ttl_segundos, resposta)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+                self.evictions += 1
+
+    def limpar(self) -> None:
+        """Remove todas as respostas do cache."""
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores do cache."""
+        return {
+            'tamanho': len(self._itens),
+            'capacidade': self.capacidade,
+            'hits': self.hits,
+            'hits_similares': self.hits_similares,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expiradas': self.expiradas,
+        }
+
+    def _remover_expiradas(self, agora: float) -> None:
+        """Descarta as respostas vencidas (chamado com o lock adquirido)."""
+        vencidas = [chave for chave, (expira_em, _) in self._itens.items() if expira_em <= agora]
+        for chave in vencidas:
+            del self._itens[chave]
+        self.expiradas += len(vencidas)
+
+    def _buscar_similar(self, chave: str) -> Optional[str]:
+        """Procura a chave em cache mais parecida acima do limiar (com o lock adquirido)."""
+        if self.limiar_similaridade is None or not chave:
+            return None
+
+        vetor = Counter(chave.split())
+        exatos = {token for token in vetor if _RE_TOKEN_EXATO.match(token)}
+        melhor, melhor_similaridade = None, self.limiar_similaridade
+
+        for candidata in self._itens:
+            vetor_candidata = Counter(candidata.split())
+            if {token for token in vetor_candidata if _RE_TOKEN_EXATO.match(token)} != exatos:
+                continue
+            similaridade = _cosseno(vetor, vetor_candidata)
+            if similaridade >= melhor_similaridade:
+                melhor, melhor_similaridade = candidata, similaridade
+
+        return melhor
+
+
+def _cosseno(a: Counter, b: Counter) -> float:
+    """Similaridade de cosseno entre dois vetores de contagem de palavras."""
+    produto = sum(a[token] * b[token] for token in a.keys() & b.keys())
+    if not produto:
+        return 0.0
+    norma = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return produto / norma
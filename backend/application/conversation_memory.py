@@ -0,0 +1,132 @@
+"""
+Application Layer - Memória das conversas do chat.
+Guarda as últimas mensagens de cada sessão e resume as mais antigas,
+para que perguntas de acompanhamento reaproveitem o que já foi calculado
+sem que o prompt cresça sem limite.
+"""
+
+import re
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from application.stats_pack import CARACTERES_POR_TOKEN
+
+
+# Fim de frase: pontuação seguida de espaço (não quebra "R$ 1.234,56") ou quebra de linha
+_RE_FIM_FRASE = re.compile(r'(?<=[.!?])\s+|\n+')
+_RE_NUMERO = re.compile(r'\d')
+
+
+@dataclass
+class SessaoConversa:
+    """Estado de uma conversa: turnos recentes na íntegra e resumo dos antigos."""
+    turnos: Deque[Tuple[str, str]] = field(default_factory=deque)
+    resumo: List[str] = field(default_factory=list)
+
+
+class MemoriaConversas:
+    """
+    Memória limitada das conversas, indexada pelo id da sessão.
+
+    Os últimos turnos (pergunta e resposta) ficam na íntegra; os mais
+    antigos viram uma linha de resumo com a pergunta e as frases da
+    resposta que têm números, descartando as linhas mais velhas quando o
+    orçamento de tokens acaba. Sessões inativas são descartadas (LRU).
+    """
+
+    def __init__(self, max_sessoes: int = 500, turnos_recentes: int = 3,
+                 orcamento_tokens: int = 1200):
+        """
+        Inicializa a memória.
+
+        Args:
+            max_sessoes: Número máximo de sessões mantidas
+            turnos_recentes: Turnos mantidos na íntegra em cada sessão
+            orcamento_tokens: Tamanho máximo aproximado do contexto de uma sessão
+        """
+        self.max_sessoes = max_sessoes
+        self.turnos_recentes = turnos_recentes
+        self.orcamento_tokens = orcamento_tokens
+        self.evictions = 0
+        self._sessoes: OrderedDict[str, SessaoConversa] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def registrar(self, sessao_id: str, pergunta: str, resposta: str) -> None:
+        """Acrescenta um turno à sessão, resumindo os que saem da janela recente."""
+        with self._lock:
+            sessao = self._sessoes.get(sessao_id)
+            if sessao is None:
+                sessao = self._sessoes[sessao_id] = SessaoConversa()
+                while len(self._sessoes) > self.max_sessoes:
+                    self._sessoes.popitem(last=False)
+                    self.evictions += 1
+            self._sessoes.move_to_end(sessao_id)
+
+            sessao.turnos.append((pergunta, resposta))
+            while len(sessao.turnos) > self.turnos_recentes:
+                sessao.resumo.append(self._resumir_turno(*sessao.turnos.popleft()))
+            self._limitar_resumo(sessao)
+
+    def contexto(self, sessao_id: Optional[str]) -> str:
+        """
+        Monta o contexto da conversa para o prompt do agente.
+
+        Returns:
+            Texto com o resumo e os turnos recentes, ou "" se a sessão não tem histórico
+        """
+        if not sessao_id:
+            return ""
+        with self._lock:
+            sessao = self._sessoes.get(sessao_id)
+            if sessao is None or not (sessao.turnos or sessao.resumo):
+                return ""
+            self._sessoes.move_to_end(sessao_id)
+            resumo = list(sessao.resumo)
+            turnos = list(sessao.turnos)
+
+        partes = []
+        if resumo:
+            partes.append("Resumo do início da conversa:\n" + "\n".join(resumo))
+        if turnos:
+            partes.append("Mensagens mais recentes:\n" + "\n".join(
+                f"Usuário: {pergunta}\nCFO: {self._cortar(resposta, self._limite_resposta())}"
+                for pergunta, resposta in turnos
+            ))
+        return "\n\n".join(partes)
+
+    def limpar(self, sessao_id: str) -> None:
+        """Esquece a conversa da sessão."""
+        with self._lock:
+            self._sessoes.pop(sessao_id, None)
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores da memória."""
+        return {
+            'sessoes': len(self._sessoes),
+            'max_sessoes': self.max_sessoes,
+            'evictions': self.evictions,
+        }
+
+    def _limite_resposta(self) -> int:
+        """Caracteres de cada resposta recente que cabem no orçamento."""
+        return self.orcamento_tokens * CARACTERES_POR_TOKEN // (2 * max(self.turnos_recentes, 1))
+
+    def _resumir_turno(self, pergunta: str, resposta: str) -> str:
+        """Uma linha com a pergunta e os números calculados na resposta."""
+        # Mantém as frases com números (valores, percentuais, datas)
+        frases = [f.strip() for f in _RE_FIM_FRASE.split(resposta) if _RE_NUMERO.search(f)]
+        fatos = " ".join(frases) if frases else self._cortar(resposta, 160)
+        return f"- Pergunta: {self._cortar(pergunta, 160)} | Resposta: {self._cortar(fatos, 400)}"
+
+    def _limitar_resumo(self, sessao: SessaoConversa) -> None:
+        """Descarta as linhas mais antigas do resumo que excedem o orçamento."""
+        limite = self.orcamento_tokens * CARACTERES_POR_TOKEN // 2
+        while sessao.resumo and sum(len(linha) + 1 for linha in sessao.resumo) > limite:
+            sessao.resumo.pop(0)
+
+    @staticmethod
+    def _cortar(texto: str, limite: int) -> str:
+        texto = " ".join(texto.split())
+        return texto if len(texto) <= limite else texto[:limite - 3] + "..."
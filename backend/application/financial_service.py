@@ -3,12 +3,23 @@ Application Layer - Serviço de análise financeira.
 Contém toda a lógica de análise separada da API.
 """
 
+import tempfile
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
-from infrastructure.csv_reader import C6BankCSVReader
+from pathlib import Path
+
+from application.aggregates import DIMENSOES_CUBO, AgregadosFinanceiros
+from domain.money import dividir_centavos, para_centavos, para_reais
+from infrastructure.columnar_store import ArmazemColunar
+from infrastructure.csv_reader import C6BankCSVReader, compactar_tipos, normalizar_titulos, uso_memoria
+from infrastructure.multi_csv_reader import C6BankMultiCSVReader, hash_transacoes
+from infrastructure.shared_dataset import ConjuntoCompartilhado
+from infrastructure.sqlite_store import ArmazemSQLite
+from infrastructure.statement_cache import CacheExtrato
 
 
 @dataclass
@@ -41,59 +52,302 @@ class FinancialAnalysisService:
     Responsável por processar dados e gerar insights.
     """
     
-    def __init__(self, csv_path: str):
+    def __init__(self, csv_path: str, cache: Optional[CacheExtrato] = None,
+                 linhas_por_bloco: Optional[int] = None,
+                 banco: Optional[ArmazemSQLite] = None,
+                 conjunto: Optional[ConjuntoCompartilhado] = None):
         """
         Inicializa o serviço com o caminho do CSV.
         
         Args:
-            csv_path: Caminho para o arquivo CSV do extrato
+            csv_path: Caminho para o arquivo CSV do extrato, ou um diretório/glob
+                com vários extratos (lidos em paralelo e sem duplicatas)
+            cache: Cache em disco do extrato processado (opcional)
+            linhas_por_bloco: Se informado, ativa a ingestão em stream com
+                no máximo esse número de linhas em memória por vez
+            banco: Banco indexado com as transações (opcional); se informado,
+                as consultas sobre transações individuais são feitas no banco
+            conjunto: Diretório compartilhado entre os workers da API (opcional);
+                o DataFrame é lido do CSV por um só processo e mapeado pelos demais
         """
-        self._reader = C6BankCSVReader(csv_path)
+        if C6BankMultiCSVReader.eh_multiplo(csv_path):
+            self._reader = C6BankMultiCSVReader(csv_path, cache=cache)
+        else:
+            self._reader = C6BankCSVReader(csv_path, cache=cache)
+        self._cache = cache
         self._df: Optional[pd.DataFrame] = None
+        self._linhas_por_bloco = linhas_por_bloco
+        self._agregados: Optional[AgregadosFinanceiros] = None
+        self._armazem: Optional[ArmazemColunar] = None
+        self._banco = banco
+        self._arquivos_banco: Optional[list[Path]] = None
+        self._conjunto = conjunto
+        self._arquivos_conjunto: list[Path] = []
+        self._chave_conjunto: Optional[str] = None
+        
+        # Extratos adicionados depois da carga, ainda não concatenados ao df
+        self._partes_pendentes: list[pd.DataFrame] = []
+        # Ocorrências por hash de transação, para descartar sobreposições
+        self._ocorrencias: Optional[Dict[int, int]] = None
+        self._versao_dados: Optional[str] = None
+    
+    @property
+    def modo_stream(self) -> bool:
+        """Indica se o extrato é ingerido em blocos."""
+        return self._linhas_por_bloco is not None
+    
+    @property
+    def df_sob_demanda(self) -> bool:
+        """Indica se o DataFrame completo só é lido quando alguém precisa das linhas (stream ou banco)."""
+        return self.modo_stream or self._banco is not None
     
     @property
     def df(self) -> pd.DataFrame:
-        """Retorna o DataFrame de transações."""
+        """
+        Retorna o DataFrame de transações.
+        
+        No modo stream o DataFrame é lido do armazém colunar apenas quando
+        alguém precisa das linhas (ex.: o agente); os resumos usam os agregados.
+        """
         if self._df is None:
-            self._df = self._reader.obter_dataframe_para_analise()
+            if self._banco is not None:
+                self._preparar_banco()
+                self._df = compactar_tipos(self._banco.ler())
+                self._partes_pendentes = []
+            elif self.modo_stream:
+                self.ingerir_em_stream()
+                self._df = compactar_tipos(self._armazem.ler())
+                self._partes_pendentes = []
+            elif self._conjunto is not None:
+                self._arquivos_conjunto = self._arquivos_fonte()
+                self._chave_conjunto = ConjuntoCompartilhado.chave_fonte(self._arquivos_conjunto)
+                self._df = self._conjunto.obter(
+                    self._chave_conjunto, self._reader.obter_dataframe_para_analise
+                )
+            else:
+                self._df = self._reader.obter_dataframe_para_analise()
+        if self._partes_pendentes:
+            self._df = compactar_tipos(pd.concat([self._df, *self._partes_pendentes], ignore_index=True))
+            self._partes_pendentes = []
         return self._df
     
-    def obter_resumo_geral(self) -> ResumoFinanceiro:
+    def obter_uso_memoria(self) -> Dict[str, Any]:
         """
-        Calcula o resumo financeiro geral do período.
+        Mede a memória ocupada pelo DataFrame de análise.
         
         Returns:
-            ResumoFinanceiro com métricas do período
+            Dicionário com tipo e bytes de cada coluna e o total
         """
         df = self.df
+        colunas = uso_memoria(df)
+        return {
+            'num_linhas': len(df),
+            'total_bytes': sum(colunas.values()),
+            'colunas': {
+                coluna: {'dtype': str(df[coluna].dtype), 'bytes': total}
+                for coluna, total in colunas.items()
+            }
+        }
+    
+    @property
+    def arquivo_compartilhado(self) -> Optional[Path]:
+        """Arquivo Arrow com a versão atual do df, se ele vem do conjunto compartilhado."""
+        if self._chave_conjunto is None or self._partes_pendentes:
+            return None
+        return self._conjunto.arquivo(self._chave_conjunto)
+    
+    @property
+    def agregados(self) -> AgregadosFinanceiros:
+        """Retorna os agregados do extrato, calculados uma única vez na carga."""
+        if self._agregados is None:
+            if self._banco is not None:
+                self._preparar_banco()
+                totais, cubo = self._banco.agregar(DIMENSOES_CUBO)
+                self._agregados = AgregadosFinanceiros(**totais, cubo=cubo)
+            elif self.modo_stream:
+                self.ingerir_em_stream()
+            else:
+                agregados = AgregadosFinanceiros()
+                agregados.acumular(self.df)
+                self._agregados = agregados
+        return self._agregados
+    
+    @property
+    def versao_dados(self) -> str:
+        """
+        Token que identifica o conteúdo atual dos dados.
+        Muda quando o extrato muda ou quando um novo extrato é adicionado.
+        """
+        if self._versao_dados is None:
+            self._versao_dados = self.agregados.assinatura()
+        return self._versao_dados
+    
+    def aquecer(self) -> None:
+        """
+        Carrega antecipadamente tudo que os endpoints consultam: o DataFrame
+        (exceto no modo stream ou com banco, onde só é lido sob demanda), os
+        agregados e a versão dos dados.
+        """
+        if not self.df_sob_demanda:
+            self.df
+        self.versao_dados
+    
+    def _preparar_banco(self) -> None:
+        """
+        Importa o extrato para o banco se ele ainda não tem essa versão dos
+        arquivos; caso contrário o CSV nem é lido.
+        """
+        if self._arquivos_banco is not None:
+            return
+        
+        arquivos = self._arquivos_fonte()
+        
+        def blocos():
+            if self.modo_stream:
+                return self._reader.ler_em_blocos(self._linhas_por_bloco)
+            return [self._reader.obter_dataframe_para_analise()]
+        
+        self._banco.garantir_fonte(ArmazemSQLite.chave_fonte(arquivos), blocos)
+        self._arquivos_banco = list(arquivos)
+    
+    def _arquivos_fonte(self) -> list[Path]:
+        """Arquivos de extrato de onde os dados são lidos."""
+        if isinstance(self._reader, C6BankMultiCSVReader):
+            return self._reader.listar_arquivos()
+        return [self._reader.caminho_csv]
+    
+    def ingerir_em_stream(self) -> None:
+        """
+        Lê o extrato em blocos, acumulando os agregados e gravando cada bloco
+        em um armazém colunar append-only. Nunca mantém mais que
+        linhas_por_bloco linhas do CSV em memória.
+        """
+        if self._agregados is not None:
+            return
+        
+        agregados = AgregadosFinanceiros()
+        armazem = ArmazemColunar(tempfile.mkdtemp(prefix='extrato_'))
+        for bloco in self._reader.ler_em_blocos(self._linhas_por_bloco or 100_000):
+            agregados.acumular(bloco)
+            armazem.anexar(bloco)
+        armazem.fechar()
         
-        total_entradas = float(df['Entrada'].sum())
-        total_saidas = float(df['Saida'].sum())
+        self._armazem = armazem
+        self._agregados = agregados
+    
+    def encerrar(self) -> None:
+        """
+        Remove os arquivos temporários do serviço (o armazém colunar do modo
+        stream). Chamado quando o serviço deixa de ser usado, ex.: na recarga.
+        """
+        if self._armazem is not None:
+            self._armazem.remover()
+            self._armazem = None
+    
+    def adicionar_extrato(self, caminho: str) -> int:
+        """
+        Acrescenta um novo extrato (ex.: o mês recém-exportado) aos dados.
+        
+        Apenas o novo arquivo é lido; transações que já existem no histórico
+        (períodos sobrepostos) são descartadas e os agregados são atualizados
+        somente com as linhas novas.
+        
+        Args:
+            caminho: Caminho do CSV do novo extrato
+            
+        Returns:
+            Número de transações efetivamente adicionadas
+        """
+        agregados = self.agregados
+        ocorrencias = self._contar_ocorrencias()
+        
+        novo = C6BankCSVReader(caminho, cache=self._cache).obter_dataframe_para_analise()
+        hashes = hash_transacoes(novo)
+        
+        # Numera as ocorrências de cada transação dentro do novo extrato e
+        # mantém só as que excedem o que o histórico já tem
+        ocorrencia_no_extrato = pd.Series(hashes).groupby(hashes).cumcount().to_numpy() + 1
+        ja_existentes = np.array([ocorrencias.get(h, 0) for h in hashes.tolist()], dtype=np.int64)
+        novas = novo[ocorrencia_no_extrato > ja_existentes]
+        
+        for h, total in zip(hashes.tolist(), ocorrencia_no_extrato.tolist()):
+            if total > ocorrencias.get(h, 0):
+                ocorrencias[h] = total
+        
+        if novas.empty:
+            return 0
+        
+        agregados.acumular(novas)
+        self._versao_dados = None
+        if self._banco is not None:
+            self._arquivos_banco.append(Path(caminho))
+            self._banco.anexar(novas, ArmazemSQLite.chave_fonte(self._arquivos_banco))
+        elif self.modo_stream:
+            self._armazem.anexar(novas)
+            self._armazem.fechar()
+        if self._df is not None:
+            self._partes_pendentes.append(novas)
+            if self._chave_conjunto is not None:
+                # Publica a nova versão; os outros workers a abrem ao recarregar
+                self._arquivos_conjunto.append(Path(caminho))
+                self._chave_conjunto = ConjuntoCompartilhado.chave_fonte(self._arquivos_conjunto)
+                self._df = self._conjunto.publicar(self.df, self._chave_conjunto)
+        
+        return len(novas)
+    
+    def _contar_ocorrencias(self) -> Dict[int, int]:
+        """Conta as ocorrências de cada hash de transação do histórico (uma única vez)."""
+        if self._ocorrencias is None:
+            if self._banco is not None:
+                blocos = self._banco.iterar_blocos()
+            elif self.modo_stream:
+                blocos = self._armazem.iterar_blocos()
+            else:
+                blocos = [self.df]
+            ocorrencias: Dict[int, int] = {}
+            for bloco in blocos:
+                contagem = pd.Series(hash_transacoes(bloco)).value_counts()
+                for h, total in zip(contagem.index.tolist(), contagem.tolist()):
+                    ocorrencias[h] = ocorrencias.get(h, 0) + total
+            self._ocorrencias = ocorrencias
+        return self._ocorrencias
+    
+    def obter_resumo_geral(self) -> ResumoFinanceiro:
+        """
+        Calcula o resumo financeiro geral do período.
         
-        # Saldo real = último saldo do extrato (não calculado)
-        # Ordenar por data e pegar o saldo da última transação
-        df_sorted = df.sort_values('Data')
-        saldo_atual = float(df_sorted['Saldo'].iloc[-1])
+        Returns:
+            ResumoFinanceiro com métricas do período
+        """
+        ag = self.agregados
         
+        # Saldo real = último saldo do extrato (não calculado), mantido nos agregados
         # Taxa de poupança: quanto % das entradas foi poupado
-        saldo_calculado = total_entradas - total_saidas
-        taxa_poupanca = (saldo_calculado / total_entradas * 100) if total_entradas > 0 else 0
+        taxa_poupanca = self._taxa_poupanca(ag.total_entradas_centavos, ag.total_saidas_centavos)
         
         # Média diária de gastos
-        dias_periodo = (df['Data'].max() - df['Data'].min()).days or 1
-        media_diaria = total_saidas / dias_periodo
+        dias_periodo = (ag.data_fim - ag.data_inicio).days if ag.num_transacoes else 0
+        media_diaria = dividir_centavos(ag.total_saidas_centavos, dias_periodo or 1)
         
+        # Valores em centavos até aqui; convertidos para reais só na saída
         return ResumoFinanceiro(
-            total_entradas=round(total_entradas, 2),
-            total_saidas=round(total_saidas, 2),
-            saldo_periodo=round(saldo_atual, 2),  # Usar saldo real do extrato
-            taxa_poupanca=round(taxa_poupanca, 2),
-            media_diaria_gastos=round(media_diaria, 2),
-            maior_gasto=round(df['Saida'].max(), 2),
-            maior_entrada=round(df['Entrada'].max(), 2),
-            num_transacoes=len(df)
+            total_entradas=para_reais(ag.total_entradas_centavos),
+            total_saidas=para_reais(ag.total_saidas_centavos),
+            saldo_periodo=para_reais(ag.saldo_final_centavos),  # Usar saldo real do extrato
+            taxa_poupanca=taxa_poupanca,
+            media_diaria_gastos=para_reais(media_diaria),
+            maior_gasto=para_reais(ag.maior_gasto_centavos),
+            maior_entrada=para_reais(ag.maior_entrada_centavos),
+            num_transacoes=ag.num_transacoes
         )
     
+    @staticmethod
+    def _taxa_poupanca(entradas_centavos: int, saidas_centavos: int) -> float:
+        """Percentual das entradas que foi poupado, com duas casas."""
+        if entradas_centavos <= 0:
+            return 0
+        return round((entradas_centavos - saidas_centavos) / entradas_centavos * 100, 2)
+    
     def obter_resumo_por_mes(self) -> list[ResumoMensal]:
         """
         Calcula resumo financeiro por mês.
@@ -101,27 +355,28 @@ class FinancialAnalysisService:
         Returns:
             Lista de ResumoMensal para cada mês
         """
-        df = self.df
-        resumos = []
+        cubo = self.agregados.cubo
+        por_mes = cubo.groupby(level='Mes_Ano', observed=True)[['Entrada', 'Saida']].sum()
+        por_mes_categoria = cubo.groupby(level=['Mes_Ano', 'Categoria'], observed=True)['Saida'].sum()
+        por_mes_categoria = por_mes_categoria[por_mes_categoria > 0]
         
-        for mes_ano in df['Mes_Ano'].unique():
-            df_mes = df[df['Mes_Ano'] == mes_ano]
-            
-            total_entradas = df_mes['Entrada'].sum()
-            total_saidas = df_mes['Saida'].sum()
-            saldo = total_entradas - total_saidas
-            taxa_poupanca = (saldo / total_entradas * 100) if total_entradas > 0 else 0
-            
+        gastos_por_mes = {
+            mes_ano: grupo.droplevel('Mes_Ano')
+            for mes_ano, grupo in por_mes_categoria.groupby(level='Mes_Ano', observed=True)
+        }
+        
+        resumos = []
+        for mes_ano, entradas, saidas in zip(por_mes.index, por_mes['Entrada'].tolist(), por_mes['Saida'].tolist()):
             # Gastos por categoria
-            gastos_categoria = df_mes[df_mes['Saida'] > 0].groupby('Categoria')['Saida'].sum().to_dict()
+            gastos_categoria = gastos_por_mes.get(mes_ano, pd.Series(dtype='int64'))
             
             resumos.append(ResumoMensal(
-                mes_ano=mes_ano,
-                total_entradas=round(total_entradas, 2),
-                total_saidas=round(total_saidas, 2),
-                saldo=round(saldo, 2),
-                taxa_poupanca=round(taxa_poupanca, 2),
-                gastos_por_categoria={k: round(v, 2) for k, v in gastos_categoria.items()}
+                mes_ano=str(mes_ano),
+                total_entradas=para_reais(entradas),
+                total_saidas=para_reais(saidas),
+                saldo=para_reais(entradas - saidas),
+                taxa_poupanca=self._taxa_poupanca(entradas, saidas),
+                gastos_por_categoria={str(k): para_reais(v) for k, v in gastos_categoria.items()}
             ))
         
         return sorted(resumos, key=lambda x: x.mes_ano)
@@ -133,9 +388,7 @@ class FinancialAnalysisService:
         Returns:
             Dicionário com categoria -> valor total
         """
-        df = self.df
-        gastos = df[df['Saida'] > 0].groupby('Categoria')['Saida'].sum()
-        return {str(k): round(float(v), 2) for k, v in gastos.sort_values(ascending=False).items()}
+        return self._total_por_categoria('Saida')
     
     def obter_entradas_por_categoria(self) -> Dict[str, float]:
         """
@@ -144,9 +397,45 @@ class FinancialAnalysisService:
         Returns:
             Dicionário com categoria -> valor total
         """
-        df = self.df
-        entradas = df[df['Entrada'] > 0].groupby('Categoria')['Entrada'].sum()
-        return {str(k): round(float(v), 2) for k, v in entradas.sort_values(ascending=False).items()}
+        return self._total_por_categoria('Entrada')
+    
+    def _total_por_categoria(self, coluna: str) -> Dict[str, float]:
+        """Soma a coluna (Entrada ou Saida) por categoria a partir dos agregados."""
+        totais = self.agregados.cubo.groupby(level='Categoria', observed=True)[coluna].sum()
+        totais = totais[totais > 0].sort_values(ascending=False)
+        return {str(k): para_reais(v) for k, v in totais.items()}
+    
+    def obter_meses(self) -> list[str]:
+        """
+        Lista os meses com transações.
+        
+        Returns:
+            Meses no formato YYYY-MM, em ordem cronológica
+        """
+        return sorted(str(m) for m in self.agregados.cubo.index.unique(level='Mes_Ano'))
+    
+    def obter_totais_categoria(self, categoria: str, mes_ano: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Soma as transações de uma categoria, no período todo ou em um mês.
+        
+        Args:
+            categoria: Nome da categoria (valor de CategoriaTransacao)
+            mes_ano: Mês no formato YYYY-MM (opcional)
+        
+        Returns:
+            Dicionário com total de entradas, saídas e número de transações
+        """
+        cubo = self.agregados.cubo
+        mascara = cubo.index.get_level_values('Categoria') == categoria
+        if mes_ano is not None:
+            mascara &= cubo.index.get_level_values('Mes_Ano') == mes_ano
+        selecao = cubo[mascara]
+        
+        return {
+            'total_entradas': para_reais(selecao['Entrada'].sum()),
+            'total_saidas': para_reais(selecao['Saida'].sum()),
+            'num_transacoes': int(selecao['Num'].sum())
+        }
     
     def obter_gastos_alimentacao_fora(self) -> Dict[str, Any]:
         """
@@ -156,28 +445,30 @@ class FinancialAnalysisService:
         Returns:
             Dicionário com análise de gastos com alimentação
         """
-        df = self.df
+        ag = self.agregados
         
         categorias_alimentacao = ['Alimentação', 'Restaurantes/Bares']
-        df_alimentacao = df[df['Categoria'].isin(categorias_alimentacao)]
+        cubo_alimentacao = ag.cubo[
+            ag.cubo.index.get_level_values('Categoria').isin(categorias_alimentacao)
+        ]
         
-        total = float(df_alimentacao['Saida'].sum())
-        num_transacoes = int(len(df_alimentacao))
-        media_por_transacao = total / num_transacoes if num_transacoes > 0 else 0
+        total = int(cubo_alimentacao['Saida'].sum())
+        num_transacoes = int(cubo_alimentacao['Num'].sum())
+        media_por_transacao = dividir_centavos(total, num_transacoes) if num_transacoes > 0 else 0
         
         # Por mês
-        por_mes = df_alimentacao.groupby('Mes_Ano')['Saida'].sum().to_dict()
+        por_mes = cubo_alimentacao.groupby(level='Mes_Ano', observed=True)['Saida'].sum().to_dict()
         
         # Percentual do total de gastos
-        total_gastos = float(df['Saida'].sum())
+        total_gastos = ag.total_saidas_centavos
         percentual = (total / total_gastos * 100) if total_gastos > 0 else 0
         
         return {
-            'total': round(total, 2),
+            'total': para_reais(total),
             'num_transacoes': num_transacoes,
-            'media_por_transacao': round(media_por_transacao, 2),
+            'media_por_transacao': para_reais(media_por_transacao),
             'percentual_dos_gastos': round(percentual, 2),
-            'por_mes': {str(k): round(float(v), 2) for k, v in por_mes.items()}
+            'por_mes': {str(k): para_reais(v) for k, v in por_mes.items()}
         }
     
     def obter_maiores_gastos(self, limite: int = 10) -> pd.DataFrame:
@@ -190,6 +481,10 @@ class FinancialAnalysisService:
         Returns:
             DataFrame com os maiores gastos
         """
+        if self._banco is not None:
+            self._preparar_banco()
+            return self._banco.maiores('Saida', limite)
+        
         df = self.df
         return df[df['Saida'] > 0].nlargest(limite, 'Saida')[
             ['Data', 'Titulo', 'Descricao', 'Saida', 'Categoria']
@@ -205,11 +500,38 @@ class FinancialAnalysisService:
         Returns:
             DataFrame com as maiores entradas
         """
+        if self._banco is not None:
+            self._preparar_banco()
+            return self._banco.maiores('Entrada', limite)
+        
         df = self.df
         return df[df['Entrada'] > 0].nlargest(limite, 'Entrada')[
             ['Data', 'Titulo', 'Descricao', 'Entrada', 'Categoria']
         ]
     
+    def obter_gastos_por_titulo(self, limite: int = 10) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna os estabelecimentos/destinatários com maior gasto total.
+        Títulos que diferem só em maiúsculas ou espaços são somados juntos.
+
+        Args:
+            limite: Número máximo de títulos a retornar
+
+        Returns:
+            Dicionário com título -> total gasto e número de transações
+        """
+        if self._banco is not None:
+            self._preparar_banco()
+            por_titulo = self._banco.gastos_por_titulo(limite).set_index('Titulo')
+            por_titulo.columns = ['sum', 'size']
+        else:
+            por_titulo = self._gastos_por_titulo(self.df['Saida'] > 0).head(limite)
+
+        return {
+            str(titulo): {'total': para_reais(total), 'num_transacoes': int(num)}
+            for titulo, total, num in zip(por_titulo.index, por_titulo['sum'].tolist(), por_titulo['size'].tolist())
+        }
+
     def obter_transferencias_pessoais(self) -> Dict[str, Any]:
         """
         Analisa transferências pessoais (Pix para pessoas).
@@ -217,21 +539,48 @@ class FinancialAnalysisService:
         Returns:
             Dicionário com análise de transferências
         """
-        df = self.df
+        if self._banco is not None:
+            self._preparar_banco()
+            resumo = self._banco.resumo_categoria('Transferência Pessoal')
+            por_pessoa = self._banco.gastos_por_titulo(10, categoria='Transferência Pessoal')
+            return {
+                'total_enviado': para_reais(resumo['total']),
+                'num_transferencias': resumo['num'],
+                'por_pessoa': {k: para_reais(v) for k, v in zip(por_pessoa['Titulo'], por_pessoa['total'])}
+            }
         
-        df_transf = df[df['Categoria'] == 'Transferência Pessoal']
+        # Total e quantidade saem do cubo de agregados
+        totais = self.obter_totais_categoria('Transferência Pessoal')
         
-        total_enviado = df_transf['Saida'].sum()
+        df = self.df
         
         # Agrupa por destinatário (título contém o nome)
-        por_pessoa = df_transf.groupby('Titulo')['Saida'].sum().sort_values(ascending=False)
+        por_pessoa = self._gastos_por_titulo((df['Categoria'] == 'Transferência Pessoal') & (df['Saida'] > 0))
         
         return {
-            'total_enviado': round(total_enviado, 2),
-            'num_transferencias': len(df_transf),
-            'por_pessoa': {k: round(v, 2) for k, v in por_pessoa.head(10).items()}
+            'total_enviado': totais['total_saidas'],
+            'num_transferencias': totais['num_transacoes'],
+            'por_pessoa': {str(k): para_reais(v) for k, v in por_pessoa['sum'].head(10).items()}
         }
     
+    def _gastos_por_titulo(self, mascara: pd.Series) -> pd.DataFrame:
+        """
+        Soma (em centavos) e contagem das saídas selecionadas por título
+        normalizado, dos maiores para os menores, como em ArmazemSQLite.gastos_por_titulo.
+        """
+        gastos = self.df.loc[mascara, ['Titulo', 'Saida']]
+        gastos = gastos.assign(
+            Titulo=gastos['Titulo'].astype(str),
+            Saida=para_centavos(gastos['Saida']),
+            Chave=normalizar_titulos(gastos['Titulo'])
+        )
+        por_titulo = gastos.groupby('Chave').agg(
+            Titulo=('Titulo', 'min'), sum=('Saida', 'sum'), size=('Saida', 'size')
+        )
+        # Ordenação estável: empates ficam na ordem do título normalizado
+        por_titulo = por_titulo.sort_values('sum', ascending=False, kind='stable')
+        return por_titulo.set_index('Titulo')
+    
     def gerar_insights(self) -> list[str]:
         """
         Gera insights automáticos sobre as finanças.
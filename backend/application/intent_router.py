@@ -0,0 +1,349 @@
+"""
+Application Layer - Roteador de intenções do chat.
+Responde às perguntas mais comuns direto pelo serviço financeiro, sem
+passar pelo agente LLM.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+from application.financial_service import FinancialAnalysisService
+from domain.entities import CategoriaTransacao
+
+
+MESES = {
+    'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+    'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12,
+}
+NOMES_MESES = {numero: nome for nome, numero in MESES.items()}
+NOMES_MESES[3] = 'março'
+
+# Palavras (já sem acento) que identificam cada categoria na pergunta
+SINONIMOS_CATEGORIA: Dict[str, CategoriaTransacao] = {
+    'alimentacao': CategoriaTransacao.ALIMENTACAO,
+    'comida': CategoriaTransacao.ALIMENTACAO,
+    'supermercado': CategoriaTransacao.SUPERMERCADO,
+    'mercado': CategoriaTransacao.SUPERMERCADO,
+    'transporte': CategoriaTransacao.TRANSPORTE,
+    'saude': CategoriaTransacao.SAUDE,
+    'farmacia': CategoriaTransacao.SAUDE,
+    'moradia': CategoriaTransacao.MORADIA,
+    'aluguel': CategoriaTransacao.MORADIA,
+    'tarifas': CategoriaTransacao.TARIFAS_BANCARIAS,
+    'tarifa': CategoriaTransacao.TARIFAS_BANCARIAS,
+    'lazer': CategoriaTransacao.LAZER,
+    'entretenimento': CategoriaTransacao.LAZER,
+    'restaurantes': CategoriaTransacao.RESTAURANTES,
+    'restaurante': CategoriaTransacao.RESTAURANTES,
+    'bares': CategoriaTransacao.RESTAURANTES,
+    'compras': CategoriaTransacao.COMPRAS,
+    'servicos': CategoriaTransacao.SERVICOS,
+    'assinaturas': CategoriaTransacao.ASSINATURAS,
+    'assinatura': CategoriaTransacao.ASSINATURAS,
+    'apps': CategoriaTransacao.ASSINATURAS,
+    'transferencias pessoais': CategoriaTransacao.TRANSFERENCIA_PESSOAL,
+    'transferencia pessoal': CategoriaTransacao.TRANSFERENCIA_PESSOAL,
+    'pix enviado': CategoriaTransacao.PIX_ENVIADO,
+    'pix enviados': CategoriaTransacao.PIX_ENVIADO,
+    'pix recebido': CategoriaTransacao.PIX_RECEBIDO,
+    'pix recebidos': CategoriaTransacao.PIX_RECEBIDO,
+    'salario': CategoriaTransacao.SALARIO,
+    'estorno': CategoriaTransacao.ESTORNO,
+    'estornos': CategoriaTransacao.ESTORNO,
+    'devolucoes': CategoriaTransacao.ESTORNO,
+    'saque': CategoriaTransacao.SAQUE,
+    'saques': CategoriaTransacao.SAQUE,
+}
+
+NUMEROS_POR_EXTENSO = {'tres': 3, 'cinco': 5, 'dez': 10, 'vinte': 20}
+
+# Palavras que podem aparecer nas perguntas atendidas pelo roteador. Uma
+# palavra fora deste vocabulário (ex.: um estabelecimento, "uber") indica
+# uma pergunta mais específica, que fica com o agente. "fora" só é aceito
+# dentro de _RE_ALIMENTACAO_FORA ("quanto gastei fora de janeiro" não é
+# o resumo de janeiro).
+VOCABULARIO = frozenset("""
+    a o as os e de do da dos das em no na nos nas com para pra por ao aos ate
+    eu meu minha meus minhas me mim voce seu sua qual quais quanto quanta quantos quantas
+    total totais valor valores soma foi foram sao tem tive teve fiz fizeram vai
+    gastei gasto gastos gastar gastou despesa despesas saida saidas paguei pagamentos dinheiro
+    recebi ganhei entrada entradas receita receitas recebimentos
+    maiores maior top principais lista liste listar mostre mostra mostrar ver quero saber
+    categoria categorias onde mais que
+    resumo balanco como geral periodo mes mensal ultimo este esse atual todo tudo
+    saldo conta tenho taxa poupanca poupei economizei
+    comer comendo alimentacao delivery transacoes lancamentos
+""".split())
+
+# Perguntas que pedem raciocínio ou recomendação ficam com o agente
+_RE_PERGUNTA_ABERTA = re.compile(
+    r'\b(por que|porque|como posso|como (?:reduzir|economizar|melhorar)|dicas?|devo|deveria|'
+    r'compar\w*|media|previs\w*|planej\w*|invest\w*|recomend\w*|sugest\w*|analis\w*)\b'
+)
+_RE_CATEGORIA = re.compile(
+    r'\b(' + '|'.join(sorted(map(re.escape, SINONIMOS_CATEGORIA), key=len, reverse=True)) + r')\b'
+)
+_RE_MES_NOME = re.compile(r'\b(' + '|'.join(MESES) + r')\b(?:\s+(?:de\s+)?(\d{4}))?')
+_RE_MES_ISO = re.compile(r'\b(\d{4})-(\d{1,2})\b')
+_RE_MES_BARRA = re.compile(r'\b(\d{1,2})/(\d{4})\b')
+_RE_ULTIMO_MES = re.compile(r'\b(ultimo mes|este mes|esse mes|mes atual)\b')
+_RE_TOP = re.compile(r'\b(maiores|top|principais)\b')
+_RE_TOP_N = re.compile(
+    r'\b(?:top|maiores|principais)\s+(\d{1,2}|' + '|'.join(NUMEROS_POR_EXTENSO) + r')\b|'
+    r'\b(\d{1,2}|' + '|'.join(NUMEROS_POR_EXTENSO) + r')\s+(?:maiores|principais)\b'
+)
+_RE_ENTRADAS = re.compile(r'\b(entradas?|receitas?|recebi|ganhei|recebimentos?)\b')
+_RE_GASTOS = re.compile(r'\b(gast\w*|despesas?|saidas?|paguei)\b')
+_RE_POR_CATEGORIA = re.compile(r'\bpor categoria\b|\bonde (?:eu )?(?:mais )?gast|\bcom o que (?:eu )?(?:mais )?gast')
+_RE_QUANTO = re.compile(r'\b(quanto|quantos|total|valor|soma)\b')
+_RE_RESUMO = re.compile(r'\b(resumo|balanco|como foi|como foram)\b')
+_RE_SALDO = re.compile(r'\bsaldo\b')
+_RE_POUPANCA = re.compile(r'\b(taxa de poupanca|poupei|economizei)\b')
+_RE_ALIMENTACAO_FORA = re.compile(r'\b(?:(?:comer|comendo|alimentacao) fora(?!\s+d[aeo]s?\b)|delivery)\b')
+_RES_MES = (_RE_ULTIMO_MES, _RE_MES_ISO, _RE_MES_BARRA, _RE_MES_NOME)
+
+
+def normalizar_pergunta(pergunta: str) -> str:
+    """Remove acentos, pontuação e espaços repetidos e converte para minúsculas."""
+    sem_acento = unicodedata.normalize('NFKD', pergunta).encode('ascii', 'ignore').decode('ascii')
+    texto = re.sub(r'[^\w\s/-]', ' ', sem_acento.lower())
+    return re.sub(r'\s+', ' ', texto).strip()
+
+
+def formatar_reais(valor: float) -> str:
+    """Formata um valor no padrão brasileiro (R$ 1.234,56)."""
+    return 'R$ ' + f'{valor:,.2f}'.replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+class RoteadorIntencoes:
+    """
+    Identifica perguntas frequentes (total por categoria, gastos por
+    categoria, resumo de um mês, maiores gastos/entradas, saldo) e as
+    responde com os agregados do serviço em milissegundos.
+
+    Perguntas que não se encaixam com segurança em nenhuma intenção
+    retornam None e seguem para o agente.
+    """
+
+    LIMITE_PADRAO = 10
+    LIMITE_MAXIMO = 50
+
+    def __init__(self, service: FinancialAnalysisService):
+        """
+        Inicializa o roteador.
+
+        Args:
+            service: Serviço financeiro usado para responder
+        """
+        self.service = service
+
+    def responder(self, pergunta: str) -> Optional[str]:
+        """
+        Responde à pergunta se ela corresponder a uma intenção conhecida.
+
+        Args:
+            pergunta: Mensagem do usuário
+
+        Returns:
+            Texto da resposta, ou None se a pergunta deve ir para o agente
+        """
+        texto = normalizar_pergunta(pergunta)
+        if not texto or _RE_PERGUNTA_ABERTA.search(texto):
+            return None
+
+        categorias = {SINONIMOS_CATEGORIA[c] for c in _RE_CATEGORIA.findall(texto)}
+        if len(categorias) > 1 or not self._entendeu_tudo(texto):
+            return None
+        categoria = categorias.pop() if categorias else None
+
+        # Intervalos, listas de meses e meses inválidos ficam com o agente
+        mencoes = self._mencoes_mes(texto)
+        if len(mencoes) > 1:
+            return None
+        mes_ano = self._extrair_mes(mencoes[0]) if mencoes else None
+        if mencoes and mes_ano is None:
+            return None
+        if mes_ano is not None and mes_ano not in self.service.obter_meses():
+            return f"Não encontrei transações em {self._nome_mes(mes_ano)} no seu extrato."
+
+        if _RE_TOP.search(texto) and (_RE_GASTOS.search(texto) or _RE_ENTRADAS.search(texto)):
+            # Os maiores lançamentos só estão disponíveis para o período todo
+            if mes_ano is not None or categoria:
+                return None
+            return self._responder_maiores(texto)
+
+        if _RE_ALIMENTACAO_FORA.search(texto) and mes_ano is None:
+            return self._responder_alimentacao_fora()
+
+        if _RE_POR_CATEGORIA.search(texto):
+            return self._responder_gastos_por_categoria(mes_ano)
+
+        if categoria and (_RE_QUANTO.search(texto) or _RE_GASTOS.search(texto) or _RE_ENTRADAS.search(texto)):
+            return self._responder_categoria(categoria, mes_ano)
+
+        if categoria:
+            return None
+
+        if _RE_RESUMO.search(texto):
+            return self._responder_resumo_mes(mes_ano) if mes_ano else self._responder_resumo_geral()
+
+        if _RE_QUANTO.search(texto) and (_RE_GASTOS.search(texto) or _RE_ENTRADAS.search(texto)):
+            if mes_ano:
+                return self._responder_resumo_mes(mes_ano)
+            return self._responder_resumo_geral()
+
+        if mes_ano is None and _RE_SALDO.search(texto):
+            resumo = self.service.obter_resumo_geral()
+            return f"Seu saldo atual no extrato é de {formatar_reais(resumo.saldo_periodo)}."
+
+        if mes_ano is None and _RE_POUPANCA.search(texto):
+            resumo = self.service.obter_resumo_geral()
+            return (
+                f"Sua taxa de poupança no período é de {resumo.taxa_poupanca:.1f}%: "
+                f"entraram {formatar_reais(resumo.total_entradas)} e saíram "
+                f"{formatar_reais(resumo.total_saidas)}."
+            )
+
+        return None
+
+    @staticmethod
+    def _entendeu_tudo(texto: str) -> bool:
+        """Verifica se todas as palavras da pergunta são conhecidas pelo roteador."""
+        for regex in (_RE_ALIMENTACAO_FORA, _RE_CATEGORIA, _RE_MES_NOME, _RE_MES_ISO, _RE_MES_BARRA, _RE_TOP_N):
+            texto = regex.sub(' ', texto)
+        return all(palavra in VOCABULARIO for palavra in texto.split())
+
+    @staticmethod
+    def _mencoes_mes(texto: str) -> List[re.Match]:
+        """Lista as menções a meses na pergunta, na ordem em que aparecem."""
+        mencoes = [encontrado for regex in _RES_MES for encontrado in regex.finditer(texto)]
+        return sorted(mencoes, key=lambda encontrado: encontrado.start())
+
+    def _extrair_mes(self, mencao: re.Match) -> Optional[str]:
+        """Converte uma menção a mês em YYYY-MM (None se o mês não for válido)."""
+        meses = self.service.obter_meses()
+        if mencao.re is _RE_ULTIMO_MES:
+            return meses[-1] if meses else None
+
+        if mencao.re is _RE_MES_ISO:
+            ano, mes = int(mencao.group(1)), int(mencao.group(2))
+            return f"{ano:04d}-{mes:02d}" if 1 <= mes <= 12 else None
+
+        if mencao.re is _RE_MES_BARRA:
+            mes, ano = int(mencao.group(1)), int(mencao.group(2))
+            return f"{ano:04d}-{mes:02d}" if 1 <= mes <= 12 else None
+
+        mes = MESES[mencao.group(1)]
+        if mencao.group(2):
+            return f"{mencao.group(2)}-{mes:02d}"
+
+        # Sem ano: o mês mais recente do extrato com esse número
+        candidatos = [m for m in meses if m.endswith(f"-{mes:02d}")]
+        if candidatos:
+            return candidatos[-1]
+        return f"{meses[-1][:4]}-{mes:02d}" if meses else None
+
+    @staticmethod
+    def _nome_mes(mes_ano: str) -> str:
+        """Converte YYYY-MM em 'janeiro de 2025'."""
+        ano, mes = mes_ano.split('-')
+        return f"{NOMES_MESES[int(mes)]} de {ano}"
+
+    @staticmethod
+    def _listar_valores(valores: Dict[str, float]) -> str:
+        """Monta uma lista em Markdown de categoria -> valor."""
+        return '\n'.join(f"- {nome}: {formatar_reais(valor)}" for nome, valor in valores.items())
+
+    def _responder_categoria(self, categoria: CategoriaTransacao, mes_ano: Optional[str]) -> str:
+        totais = self.service.obter_totais_categoria(categoria.value, mes_ano)
+        periodo = f"em {self._nome_mes(mes_ano)}" if mes_ano else "no período"
+
+        if totais['num_transacoes'] == 0:
+            return f"Não há transações de {categoria.value} {periodo}."
+
+        if totais['total_entradas'] > totais['total_saidas']:
+            return (
+                f"Você recebeu {formatar_reais(totais['total_entradas'])} em {categoria.value} "
+                f"{periodo} ({totais['num_transacoes']} transações)."
+            )
+        return (
+            f"Você gastou {formatar_reais(totais['total_saidas'])} com {categoria.value} "
+            f"{periodo} ({totais['num_transacoes']} transações)."
+        )
+
+    def _responder_gastos_por_categoria(self, mes_ano: Optional[str]) -> str:
+        if mes_ano:
+            resumo = next(r for r in self.service.obter_resumo_por_mes() if r.mes_ano == mes_ano)
+            gastos = dict(sorted(resumo.gastos_por_categoria.items(), key=lambda item: item[1], reverse=True))
+            titulo = f"Gastos por categoria em {self._nome_mes(mes_ano)}"
+        else:
+            gastos = self.service.obter_gastos_por_categoria()
+            titulo = "Gastos por categoria no período"
+
+        if not gastos:
+            return f"{titulo}: nenhum gasto registrado."
+        return f"{titulo}:\n{self._listar_valores(gastos)}"
+
+    def _responder_resumo_mes(self, mes_ano: str) -> str:
+        resumo = next(r for r in self.service.obter_resumo_por_mes() if r.mes_ano == mes_ano)
+        gastos = dict(sorted(resumo.gastos_por_categoria.items(), key=lambda item: item[1], reverse=True)[:5])
+
+        linhas = [
+            f"Resumo de {self._nome_mes(mes_ano)}:",
+            f"- Entradas: {formatar_reais(resumo.total_entradas)}",
+            f"- Saídas: {formatar_reais(resumo.total_saidas)}",
+            f"- Saldo do mês: {formatar_reais(resumo.saldo)}",
+            f"- Taxa de poupança: {resumo.taxa_poupanca:.1f}%",
+        ]
+        if gastos:
+            linhas.append("\nPrincipais categorias de gasto:")
+            linhas.append(self._listar_valores(gastos))
+        return '\n'.join(linhas)
+
+    def _responder_resumo_geral(self) -> str:
+        resumo = self.service.obter_resumo_geral()
+        return '\n'.join([
+            "Resumo do período:",
+            f"- Entradas: {formatar_reais(resumo.total_entradas)}",
+            f"- Saídas: {formatar_reais(resumo.total_saidas)}",
+            f"- Saldo atual: {formatar_reais(resumo.saldo_periodo)}",
+            f"- Taxa de poupança: {resumo.taxa_poupanca:.1f}%",
+            f"- Média diária de gastos: {formatar_reais(resumo.media_diaria_gastos)}",
+            f"- Transações: {resumo.num_transacoes}",
+        ])
+
+    def _responder_alimentacao_fora(self) -> str:
+        alimentacao = self.service.obter_gastos_alimentacao_fora()
+        return (
+            f"Você gastou {formatar_reais(alimentacao['total'])} com alimentação fora de casa "
+            f"({alimentacao['num_transacoes']} transações, média de "
+            f"{formatar_reais(alimentacao['media_por_transacao'])}), o que representa "
+            f"{alimentacao['percentual_dos_gastos']:.1f}% dos seus gastos."
+        )
+
+    def _responder_maiores(self, texto: str) -> str:
+        encontrado = _RE_TOP_N.search(texto)
+        limite = self.LIMITE_PADRAO
+        if encontrado:
+            valor = encontrado.group(1) or encontrado.group(2)
+            limite = NUMEROS_POR_EXTENSO.get(valor) or int(valor)
+        limite = max(1, min(limite, self.LIMITE_MAXIMO))
+
+        if _RE_ENTRADAS.search(texto) and not _RE_GASTOS.search(texto):
+            coluna, titulo = 'Entrada', f"Suas {limite} maiores entradas"
+            transacoes = self.service.obter_maiores_entradas(limite)
+        else:
+            coluna, titulo = 'Saida', f"Seus {limite} maiores gastos"
+            transacoes = self.service.obter_maiores_gastos(limite)
+
+        if transacoes.empty:
+            return f"{titulo}: nenhuma transação encontrada."
+
+        linhas = [f"{titulo}:"]
+        for posicao, linha in enumerate(transacoes.itertuples(index=False), start=1):
+            linhas.append(
+                f"{posicao}. {linha.Data:%d/%m/%Y} - {linha.Titulo} - "
+                f"{formatar_reais(getattr(linha, coluna))} ({linha.Categoria})"
+            )
+        return '\n'.join(linhas)
@@ -0,0 +1,120 @@
+"""
+Application Layer - Pacote de estatísticas para o prompt do agente.
+Resume o extrato (meses, categorias, principais destinos) em texto compacto,
+para que o agente responda a maioria das perguntas sem explorar o df.
+"""
+
+from typing import Callable, List
+
+from application.financial_service import FinancialAnalysisService
+
+
+# Aproximação usada para respeitar o orçamento sem depender de um tokenizador
+CARACTERES_POR_TOKEN = 4
+
+
+def _valor(valor: float) -> str:
+    """Valor compacto, sem símbolo de moeda (ex.: 1234.5 -> 1234.50)."""
+    return f"{valor:.2f}"
+
+
+def _secao_meses(service: FinancialAnalysisService) -> List[str]:
+    linhas = ["### Totais por mês (mes_ano | entradas | saídas | saldo | poupança %)"]
+    for r in service.obter_resumo_por_mes():
+        linhas.append(
+            f"{r.mes_ano} | {_valor(r.total_entradas)} | {_valor(r.total_saidas)} | "
+            f"{_valor(r.saldo)} | {r.taxa_poupanca:.1f}"
+        )
+    return linhas
+
+
+def _secao_gastos_categoria(service: FinancialAnalysisService) -> List[str]:
+    gastos = service.obter_gastos_por_categoria()
+    total = sum(gastos.values()) or 1
+    linhas = ["### Gastos por categoria no período (categoria | total | % dos gastos)"]
+    for categoria, valor in gastos.items():
+        linhas.append(f"{categoria} | {_valor(valor)} | {valor / total * 100:.1f}")
+    return linhas
+
+
+def _secao_entradas_categoria(service: FinancialAnalysisService) -> List[str]:
+    linhas = ["### Entradas por categoria no período (categoria | total)"]
+    for categoria, valor in service.obter_entradas_por_categoria().items():
+        linhas.append(f"{categoria} | {_valor(valor)}")
+    return linhas
+
+
+def _secao_destinos(service: FinancialAnalysisService) -> List[str]:
+    linhas = ["### Maiores destinos de gastos (Titulo | total | nº de transações)"]
+    for titulo, dados in service.obter_gastos_por_titulo(limite=15).items():
+        linhas.append(f"{titulo} | {_valor(dados['total'])} | {dados['num_transacoes']}")
+    return linhas
+
+
+def _secao_transferencias(service: FinancialAnalysisService) -> List[str]:
+    transferencias = service.obter_transferencias_pessoais()
+    linhas = [
+        f"### Transferências pessoais: {_valor(transferencias['total_enviado'])} em "
+        f"{transferencias['num_transferencias']} transferências (destinatário | total)"
+    ]
+    for pessoa, valor in transferencias['por_pessoa'].items():
+        linhas.append(f"{pessoa} | {_valor(valor)}")
+    return linhas
+
+
+def _secao_categorias_por_mes(service: FinancialAnalysisService) -> List[str]:
+    linhas = ["### Gastos por categoria em cada mês (mes_ano: categoria=total; ...)"]
+    for r in service.obter_resumo_por_mes():
+        gastos = sorted(r.gastos_por_categoria.items(), key=lambda item: item[1], reverse=True)
+        linhas.append(f"{r.mes_ano}: " + "; ".join(f"{c}={_valor(v)}" for c, v in gastos))
+    return linhas
+
+
+# Seções em ordem de prioridade: as primeiras entram inteiras antes das demais
+SECOES: List[Callable[[FinancialAnalysisService], List[str]]] = [
+    _secao_meses,
+    _secao_gastos_categoria,
+    _secao_entradas_categoria,
+    _secao_destinos,
+    _secao_transferencias,
+    _secao_categorias_por_mes,
+]
+
+
+def gerar_pacote_estatisticas(service: FinancialAnalysisService, orcamento_tokens: int = 1500) -> str:
+    """
+    Gera o pacote de estatísticas do extrato dentro de um orçamento de tokens.
+
+    As seções entram em ordem de prioridade; a que não couber inteira é
+    cortada no limite (mantendo o título) e as seguintes são omitidas.
+
+    Args:
+        service: Serviço financeiro com os dados atuais
+        orcamento_tokens: Tamanho máximo aproximado do texto, em tokens
+
+    Returns:
+        Texto em Markdown com as tabelas compactas
+    """
+    limite = orcamento_tokens * CARACTERES_POR_TOKEN
+    usado = 0
+    linhas: List[str] = []
+
+    for secao in SECOES:
+        conteudo = secao(service)
+        if len(conteudo) <= 1:
+            continue
+
+        titulo, *itens = conteudo
+        if usado + len(titulo) + 1 > limite:
+            break
+        linhas.append(titulo)
+        usado += len(titulo) + 1
+
+        for i, item in enumerate(itens):
+            if usado + len(item) + 1 > limite:
+                linhas.append(f"... ({len(itens) - i} linhas omitidas)")
+                return "\n".join(linhas)
+            linhas.append(item)
+            usado += len(item) + 1
+
+    return "\n".join(linhas)
@@ -0,0 +1,117 @@
+"""
+Domain Service - Cache de categorização de transações.
+Evita recategorizar textos repetidos do extrato (mesmos estabelecimentos,
+mesmos destinatários de Pix).
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class CacheCategorizacao:
+    """
+    Cache LRU limitado de categorias, indexado pelo texto normalizado
+    da transação (título + descrição) e pelo sinal entrada/saída.
+
+    O cache guarda a versão das regras de categorização com que foi
+    preenchido e é esvaziado quando essa versão muda.
+    """
+
+    def __init__(self, capacidade: int = 50_000, caminho: Optional[str] = None):
+        """
+        Inicializa o cache.
+
+        Args:
+            capacidade: Número máximo de textos distintos mantidos
+            caminho: Arquivo JSON para persistir o cache entre execuções (opcional)
+        """
+        self.capacidade = capacidade
+        self.caminho = Path(caminho) if caminho else None
+        self.versao: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._itens: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.caminho is not None:
+            self._carregar_do_disco()
+
+    @staticmethod
+    def chave(texto_normalizado: str, eh_entrada: bool) -> str:
+        """Monta a chave do cache a partir do texto normalizado e do sinal."""
+        return ('+' if eh_entrada else '-') + texto_normalizado
+
+    def garantir_versao(self, versao: str) -> None:
+        """Esvazia o cache se as regras de categorização mudaram."""
+        if self.versao == versao:
+            return
+        with self._lock:
+            if self.versao != versao:
+                self._itens.clear()
+                self.versao = versao
+
+    def obter(self, chave: str) -> Optional[str]:
+        """Retorna a categoria em cache (valor do enum) ou None."""
+        with self._lock:
+            categoria = self._itens.get(chave)
+            if categoria is None:
+                self.misses += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.hits += 1
+            return categoria
+
+    def guardar(self, chave: str, categoria: str) -> None:
+        """Guarda a categoria (valor do enum) para a chave."""
+        with self._lock:
+            self._itens[chave] = categoria
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+                self.evictions += 1
+
+    def limpar(self) -> None:
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, int]:
+        """Retorna os contadores do cache."""
+        return {
+            'tamanho': len(self._itens),
+            'capacidade': self.capacidade,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def salvar(self) -> None:
+        """Persiste o cache em disco, se um caminho foi configurado."""
+        if self.caminho is None:
+            return
+        with self._lock:
+            conteudo = {'versao': self.versao, 'itens': list(self._itens.items())}
+
+        # Escreve em arquivo temporário e renomeia para não deixar JSON parcial
+        temporario = self.caminho.with_suffix(f'{self.caminho.suffix}.{os.getpid()}.{threading.get_ident()}.tmp')
+        temporario.parent.mkdir(parents=True, exist_ok=True)
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(conteudo, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho)
+
+    def _carregar_do_disco(self) -> None:
+        """Carrega o cache persistido; arquivos inválidos são ignorados."""
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                conteudo = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self.versao = conteudo.get('versao')
+        for chave, categoria in conteudo.get('itens', [])[-self.capacidade:]:
+            self._itens[chave] = categoria
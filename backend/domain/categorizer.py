@@ -3,8 +3,15 @@ Domain Service - Lógica de categorização de transações.
 Regras de negócio para classificar transações do extrato C6 Bank.
 """
 
+import hashlib
+import json
 import re
-from typing import Tuple
+from typing import List, Optional, Pattern, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .categorization_cache import CacheCategorizacao
 from .entities import CategoriaTransacao, TipoTransacao
 
 
@@ -132,6 +139,66 @@ class CategorizadorTransacao:
         r'tesouro\s+nacional'
     ]
 
+    # Padrões de PIX (compilados uma única vez)
+    _RE_PIX_RECEBIDO = re.compile(r'pix\s+recebido')
+    _RE_PIX_ENVIADO = re.compile(r'pix\s+enviado|transf\s+enviada\s+pix')
+    _RE_ESPACOS = re.compile(r'\s+')
+
+    # Matchers combinados, montados por compilar_padroes()
+    _MATCHERS_CATEGORIA: List[Tuple[CategoriaTransacao, Pattern[str]]]
+    _MATCHER_EMPRESA: Pattern[str]
+
+    # Versão das regras (hash das tabelas de padrões), usada para invalidar caches
+    VERSAO_REGRAS: str
+
+    # Memo de categorias por texto normalizado
+    cache = CacheCategorizacao()
+
+    @classmethod
+    def compilar_padroes(cls) -> None:
+        """
+        Compila as tabelas de padrões em matchers combinados.
+
+        Cada categoria vira uma única alternação compilada, mantida na
+        ordem do dicionário para preservar a precedência. Não é uma busca
+        única no texto: uma alternação com todas as categorias devolveria
+        o padrão que casa mais à esquerda, não a categoria de maior
+        precedência, então as categorias são testadas em ordem até a
+        primeira que casar (uma busca por categoria). Os padrões são
+        compilados sem IGNORECASE porque o texto já chega em minúsculas,
+        o que permite ao motor de regex pular posições pelo primeiro
+        caractere das alternativas.
+
+        Deve ser chamado novamente se PADROES_CATEGORIA ou PADROES_EMPRESAS
+        forem alterados; a nova versão das regras invalida o cache.
+        """
+        cls._MATCHERS_CATEGORIA = [
+            (categoria, re.compile('|'.join(f'(?:{p})' for p in padroes)))
+            for categoria, padroes in cls.PADROES_CATEGORIA.items()
+        ]
+        cls._MATCHER_EMPRESA = re.compile(
+            '|'.join(f'(?:{p})' for p in cls.PADROES_EMPRESAS)
+        )
+
+        regras = json.dumps([
+            [[categoria.value, padroes] for categoria, padroes in cls.PADROES_CATEGORIA.items()],
+            cls.PADROES_EMPRESAS,
+            [cls._RE_PIX_RECEBIDO.pattern, cls._RE_PIX_ENVIADO.pattern],
+        ], ensure_ascii=False)
+        cls.VERSAO_REGRAS = hashlib.sha256(regras.encode('utf-8')).hexdigest()[:16]
+        cls.cache.garantir_versao(cls.VERSAO_REGRAS)
+
+    @classmethod
+    def configurar_cache(cls, cache: CacheCategorizacao) -> None:
+        """Substitui o cache de categorização (ex.: um cache persistido em disco)."""
+        cache.garantir_versao(cls.VERSAO_REGRAS)
+        cls.cache = cache
+
+    @classmethod
+    def normalizar_texto(cls, titulo: str, descricao: str) -> str:
+        """Combina título e descrição em minúsculas e com espaços colapsados."""
+        return cls._RE_ESPACOS.sub(' ', f"{titulo} {descricao}".lower()).strip()
+
     @classmethod
     def categorizar(cls, titulo: str, descricao: str, 
                     valor_entrada: float, valor_saida: float) -> Tuple[TipoTransacao, CategoriaTransacao]:
@@ -151,44 +218,151 @@ class CategorizadorTransacao:
         tipo = TipoTransacao.ENTRADA if valor_entrada > 0 else TipoTransacao.SAIDA
         
         # Combina título e descrição para análise
-        texto = f"{titulo} {descricao}".lower()
+        texto = cls.normalizar_texto(titulo, descricao)
+        
+        cls.cache.garantir_versao(cls.VERSAO_REGRAS)
+        chave = CacheCategorizacao.chave(texto, tipo == TipoTransacao.ENTRADA)
+        em_cache = cls.cache.obter(chave)
+        if em_cache is not None:
+            return tipo, CategoriaTransacao(em_cache)
         
+        categoria = cls._categorizar_texto(texto, tipo)
+        cls.cache.guardar(chave, categoria.value)
+        return tipo, categoria
+    
+    @classmethod
+    def _categorizar_texto(cls, texto: str, tipo: TipoTransacao) -> CategoriaTransacao:
+        """Aplica as regras de categorização sobre o texto já normalizado."""
         # Verifica se é PIX recebido
         if tipo == TipoTransacao.ENTRADA:
-            if re.search(r'pix\s+recebido', texto):
-                return tipo, CategoriaTransacao.PIX_RECEBIDO
+            if cls._RE_PIX_RECEBIDO.search(texto):
+                return CategoriaTransacao.PIX_RECEBIDO
         
         # Verifica se é PIX enviado (transferência)
         if tipo == TipoTransacao.SAIDA:
-            if re.search(r'pix\s+enviado|transf\s+enviada\s+pix', texto):
+            if cls._RE_PIX_ENVIADO.search(texto):
                 # Verifica se é para empresa ou pessoa
                 if cls._is_empresa(texto):
                     # Tenta categorizar pelo destino
                     categoria = cls._categorizar_por_padrao(texto)
                     if categoria != CategoriaTransacao.OUTROS:
-                        return tipo, categoria
-                    return tipo, CategoriaTransacao.PIX_ENVIADO
+                        return categoria
+                    return CategoriaTransacao.PIX_ENVIADO
                 else:
-                    return tipo, CategoriaTransacao.TRANSFERENCIA_PESSOAL
+                    return CategoriaTransacao.TRANSFERENCIA_PESSOAL
         
         # Tenta categorizar por padrões conhecidos
-        categoria = cls._categorizar_por_padrao(texto)
+        return cls._categorizar_por_padrao(texto)
+    
+    @classmethod
+    def categorizar_lote(cls, titulos, descricoes, entradas, saidas) -> Tuple[pd.Series, pd.Series]:
+        """
+        Categoriza um lote de transações de forma vetorizada.
+
+        Aplica as mesmas regras de categorizar(), mas coluna a coluna e
+        apenas uma vez por texto distinto: o tipo vem de uma comparação
+        vetorizada, textos já vistos saem do cache e os demais passam
+        pelos padrões como máscaras sobre as linhas ainda pendentes.
         
-        return tipo, categoria
+        Args:
+            titulos: Títulos das transações (Series ou array)
+            descricoes: Descrições das transações (Series ou array)
+            entradas: Valores de entrada (crédito)
+            saidas: Valores de saída (débito), mantido por simetria com categorizar()
+            
+        Returns:
+            Tupla com (tipos, categorias) como Series com os valores dos enums
+        """
+        titulos = pd.Series(titulos, dtype=object)
+        indice = titulos.index
+        descricoes = pd.Series(descricoes, index=indice, dtype=object)
+        entradas = np.asarray(entradas, dtype=float)
+
+        eh_entrada = entradas > 0
+        tipos = np.where(eh_entrada, TipoTransacao.ENTRADA.value, TipoTransacao.SAIDA.value)
+
+        # Agrupa as linhas por texto bruto (sinal + título + descrição) e
+        # normaliza/categoriza cada texto distinto uma única vez
+        sinais = pd.Series(np.where(eh_entrada, '+', '-'), index=indice, dtype=object)
+        brutos = sinais + titulos.map(str) + ' ' + descricoes.map(str)
+        codigos, unicos = pd.factorize(brutos.to_numpy(dtype=object))
+        chaves_unicas = [
+            bruto[0] + cls._RE_ESPACOS.sub(' ', bruto[1:].lower()).strip()
+            for bruto in unicos
+        ]
+
+        cls.cache.garantir_versao(cls.VERSAO_REGRAS)
+        categorias_unicas = np.array([cls.cache.obter(chave) for chave in chaves_unicas], dtype=object)
+        faltantes = np.flatnonzero(pd.isna(categorias_unicas))
+        if len(faltantes):
+            chaves_faltantes = list(dict.fromkeys(chaves_unicas[i] for i in faltantes))
+            calculadas = dict(zip(chaves_faltantes, cls._categorizar_textos(
+                pd.Series([chave[1:] for chave in chaves_faltantes], dtype=object),
+                np.array([chave[0] == '+' for chave in chaves_faltantes], dtype=bool),
+            )))
+            for chave, categoria in calculadas.items():
+                cls.cache.guardar(chave, categoria)
+            for i in faltantes:
+                categorias_unicas[i] = calculadas[chaves_unicas[i]]
+
+        categorias = categorias_unicas[codigos]
+        return pd.Series(tipos, index=indice), pd.Series(categorias, index=indice)
+
+    @classmethod
+    def _categorizar_textos(cls, texto: pd.Series, eh_entrada: np.ndarray) -> np.ndarray:
+        """Versão vetorizada de _categorizar_texto; retorna os valores das categorias."""
+        categorias = np.full(len(texto), CategoriaTransacao.OUTROS.value, dtype=object)
+        pendente = np.ones(len(texto), dtype=bool)
+
+        # PIX recebido
+        pix_recebido = eh_entrada & cls._contem(texto, cls._RE_PIX_RECEBIDO)
+        categorias[pix_recebido] = CategoriaTransacao.PIX_RECEBIDO.value
+        pendente &= ~pix_recebido
+
+        # PIX enviado: pessoa física vira transferência pessoal; empresa
+        # segue para os padrões e cai em PIX_ENVIADO se nada casar
+        pix_enviado = ~eh_entrada & cls._contem(texto, cls._RE_PIX_ENVIADO)
+        pix_empresa = pix_enviado & cls._contem(texto, cls._MATCHER_EMPRESA, pix_enviado)
+        pix_pessoal = pix_enviado & ~pix_empresa
+        categorias[pix_pessoal] = CategoriaTransacao.TRANSFERENCIA_PESSOAL.value
+        pendente &= ~pix_pessoal
+
+        for categoria, matcher in cls._MATCHERS_CATEGORIA:
+            if not pendente.any():
+                break
+            casou = cls._contem(texto, matcher, pendente)
+            categorias[casou] = categoria.value
+            pendente &= ~casou
+
+        categorias[pix_empresa & pendente] = CategoriaTransacao.PIX_ENVIADO.value
+        return categorias
+
+    @staticmethod
+    def _contem(texto: pd.Series, matcher: Pattern[str], mascara: Optional[np.ndarray] = None) -> np.ndarray:
+        """Aplica o matcher apenas nas linhas da máscara e retorna um array booleano."""
+        resultado = np.zeros(len(texto), dtype=bool)
+        if mascara is None:
+            mascara = np.ones(len(texto), dtype=bool)
+        if mascara.any():
+            resultado[mascara] = texto[mascara].str.contains(matcher.pattern, regex=True, na=False).to_numpy(dtype=bool)
+        return resultado
     
     @classmethod
     def _categorizar_por_padrao(cls, texto: str) -> CategoriaTransacao:
-        """Tenta categorizar o texto usando os padrões definidos."""
-        for categoria, padroes in cls.PADROES_CATEGORIA.items():
-            for padrao in padroes:
-                if re.search(padrao, texto, re.IGNORECASE):
-                    return categoria
+        """
+        Tenta categorizar o texto (em minúsculas) usando os padrões definidos.
+
+        Vence a primeira categoria de PADROES_CATEGORIA que casa no texto.
+        """
+        for categoria, matcher in cls._MATCHERS_CATEGORIA:
+            if matcher.search(texto):
+                return categoria
         return CategoriaTransacao.OUTROS
     
     @classmethod
     def _is_empresa(cls, texto: str) -> bool:
-        """Verifica se o texto indica uma empresa (vs pessoa física)."""
-        for padrao in cls.PADROES_EMPRESAS:
-            if re.search(padrao, texto, re.IGNORECASE):
-                return True
-        return False
+        """Verifica se o texto (em minúsculas) indica uma empresa (vs pessoa física)."""
+        return cls._MATCHER_EMPRESA.search(texto) is not None
+
+
+CategorizadorTransacao.compilar_padroes()
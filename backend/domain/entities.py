@@ -5,7 +5,10 @@ Domain Entities - Representação das transações financeiras.
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
 
 
 class TipoTransacao(Enum):
@@ -45,7 +48,7 @@ class CategoriaTransacao(Enum):
     OUTROS = "Outros"
 
 
-@dataclass
+@dataclass(slots=True)
 class Transacao:
     """Entidade que representa uma transação financeira."""
     data_lancamento: datetime
@@ -69,3 +72,112 @@ class Transacao:
     def valor_absoluto(self) -> float:
         """Retorna o valor absoluto da transação."""
         return self.valor_entrada if self.valor_entrada > 0 else self.valor_saida
+
+
+
+class TransacaoBatch(Sequence[Transacao]):
+    """
+    Coleção colunar de transações.
+
+    Guarda datas e valores em arrays NumPy e tipo/categoria como códigos
+    categóricos (índices nos enums). Objetos Transacao só são criados
+    sob demanda, ao acessar ou iterar a coleção.
+    """
+
+    TIPOS = list(TipoTransacao)
+    CATEGORIAS = list(CategoriaTransacao)
+
+    __slots__ = (
+        'datas_lancamento', 'datas_contabeis', 'titulos', 'descricoes',
+        'valores_entrada', 'valores_saida', 'saldos_dia',
+        'codigos_tipo', 'codigos_categoria'
+    )
+
+    def __init__(self, datas_lancamento: np.ndarray, datas_contabeis: np.ndarray,
+                 titulos: np.ndarray, descricoes: np.ndarray,
+                 valores_entrada: np.ndarray, valores_saida: np.ndarray,
+                 saldos_dia: np.ndarray, codigos_tipo: np.ndarray,
+                 codigos_categoria: np.ndarray):
+        """
+        Inicializa a coleção a partir de colunas já codificadas.
+        
+        Args:
+            datas_lancamento: Datas de lançamento (datetime64)
+            datas_contabeis: Datas contábeis (datetime64)
+            titulos: Títulos das transações
+            descricoes: Descrições das transações
+            valores_entrada: Valores de entrada (crédito)
+            valores_saida: Valores de saída (débito)
+            saldos_dia: Saldo do dia
+            codigos_tipo: Índices em TransacaoBatch.TIPOS
+            codigos_categoria: Índices em TransacaoBatch.CATEGORIAS
+        """
+        self.datas_lancamento = datas_lancamento
+        self.datas_contabeis = datas_contabeis
+        self.titulos = titulos
+        self.descricoes = descricoes
+        self.valores_entrada = valores_entrada
+        self.valores_saida = valores_saida
+        self.saldos_dia = saldos_dia
+        self.codigos_tipo = codigos_tipo
+        self.codigos_categoria = codigos_categoria
+
+    @classmethod
+    def de_colunas(cls, datas_lancamento, datas_contabeis, titulos, descricoes,
+                   valores_entrada, valores_saida, saldos_dia,
+                   tipos, categorias) -> 'TransacaoBatch':
+        """
+        Cria a coleção a partir de colunas (Series ou arrays).
+
+        Tipos e categorias são recebidos pelos valores dos enums
+        (ex.: 'saida', 'Alimentação') e convertidos em códigos.
+        """
+        return cls(
+            datas_lancamento=np.asarray(datas_lancamento, dtype='datetime64[ns]'),
+            datas_contabeis=np.asarray(datas_contabeis, dtype='datetime64[ns]'),
+            titulos=np.asarray(titulos, dtype=object),
+            descricoes=np.asarray(descricoes, dtype=object),
+            valores_entrada=np.asarray(valores_entrada, dtype=np.float64),
+            valores_saida=np.asarray(valores_saida, dtype=np.float64),
+            saldos_dia=np.asarray(saldos_dia, dtype=np.float64),
+            codigos_tipo=cls._codificar(tipos, cls.TIPOS),
+            codigos_categoria=cls._codificar(categorias, cls.CATEGORIAS),
+        )
+
+    @staticmethod
+    def _codificar(valores, membros: list) -> np.ndarray:
+        """Converte valores de enum em códigos int8 (índice no enum)."""
+        categorias = [membro.value for membro in membros]
+        codigos = pd.Categorical(valores, categories=categorias).codes
+        if (codigos < 0).any():
+            raise ValueError(f"Valor fora do enum: esperado um de {categorias}")
+        return codigos.astype(np.int8)
+
+    def __len__(self) -> int:
+        return len(self.valores_entrada)
+
+    def __getitem__(self, indice: Union[int, slice]) -> Union[Transacao, 'TransacaoBatch']:
+        if isinstance(indice, slice):
+            return TransacaoBatch(*(getattr(self, coluna)[indice] for coluna in self.__slots__))
+
+        return Transacao(
+            data_lancamento=pd.Timestamp(self.datas_lancamento[indice]),
+            data_contabil=pd.Timestamp(self.datas_contabeis[indice]),
+            titulo=self.titulos[indice],
+            descricao=self.descricoes[indice],
+            valor_entrada=float(self.valores_entrada[indice]),
+            valor_saida=float(self.valores_saida[indice]),
+            saldo_dia=float(self.saldos_dia[indice]),
+            tipo=self.TIPOS[self.codigos_tipo[indice]],
+            categoria=self.CATEGORIAS[self.codigos_categoria[indice]]
+        )
+
+    def __iter__(self) -> Iterator[Transacao]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def valores(self) -> np.ndarray:
+        """Valores das transações (positivo para entrada, negativo para saída)."""
+        eh_entrada = self.codigos_tipo == self.TIPOS.index(TipoTransacao.ENTRADA)
+        return np.where(eh_entrada, self.valores_entrada, -self.valores_saida)
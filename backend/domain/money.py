@@ -0,0 +1,26 @@
+"""
+Domain - Valores monetários em centavos.
+Totais são somados como inteiros (centavos), o que os torna exatos
+independentemente da ordem e do número de parcelas; a conversão para
+reais acontece apenas na apresentação.
+"""
+
+import numpy as np
+
+
+CENTAVOS_POR_REAL = 100
+
+
+def para_centavos(valores) -> np.ndarray:
+    """Converte valores em reais (até duas casas decimais) para centavos int64."""
+    return np.rint(np.asarray(valores, dtype=np.float64) * CENTAVOS_POR_REAL).astype(np.int64)
+
+
+def para_reais(centavos) -> float:
+    """Converte centavos para reais (o float mais próximo do valor exato)."""
+    return int(centavos) / CENTAVOS_POR_REAL
+
+
+def dividir_centavos(centavos: int, divisor: int) -> int:
+    """Divide um valor em centavos, arredondando para o centavo mais próximo (meio centavo para cima)."""
+    return (2 * int(centavos) + int(divisor)) // (2 * int(divisor))
@@ -0,0 +1,74 @@
+"""
+Infrastructure Layer - Pool de agentes do chat.
+Evita reconstruir o agente (prompt, ferramentas, cliente do LLM) a cada
+mensagem; os agentes são descartados quando os dados mudam.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+
+class PoolAgentes:
+    """
+    Pool de agentes reutilizáveis, associados a uma versão dos dados.
+
+    Cada requisição empresta um agente exclusivo (o estado da ferramenta
+    Python não é compartilhado entre conversas simultâneas) e o devolve
+    ao final. Se todos estiverem ocupados, um agente extra é criado e
+    descartado na devolução. Quando a versão dos dados muda, os agentes
+    antigos deixam de ser reaproveitados.
+
+    Usado apenas a partir do event loop, então não precisa de lock; a
+    fábrica (que monta o prompt e pode ler o df) roda em uma thread para
+    não bloquear o loop.
+    """
+
+    def __init__(self, tamanho: int = 4):
+        """
+        Inicializa o pool.
+
+        Args:
+            tamanho: Número máximo de agentes ociosos mantidos para reuso
+        """
+        self.tamanho = tamanho
+        self.versao: Optional[str] = None
+        self.criados = 0
+        self.reutilizados = 0
+        self._livres: List[Any] = []
+
+    @asynccontextmanager
+    async def emprestar(self, versao: str, criar: Callable[[], Any]) -> AsyncIterator[Any]:
+        """
+        Empresta um agente da versão informada, criando um se necessário.
+
+        Args:
+            versao: Versão dos dados com que o agente deve ter sido construído
+            criar: Fábrica síncrona chamada quando não há agente livre dessa versão
+        """
+        if versao != self.versao:
+            self.versao = versao
+            self._livres = []
+
+        if self._livres:
+            agente = self._livres.pop()
+            self.reutilizados += 1
+        else:
+            agente = await asyncio.to_thread(criar)
+            self.criados += 1
+
+        try:
+            yield agente
+        finally:
+            if versao == self.versao and len(self._livres) < self.tamanho:
+                self._livres.append(agente)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna os contadores do pool."""
+        return {
+            'versao': self.versao,
+            'livres': len(self._livres),
+            'tamanho': self.tamanho,
+            'criados': self.criados,
+            'reutilizados': self.reutilizados,
+        }
@@ -0,0 +1,72 @@
+"""
+Infrastructure Layer - Streaming dos eventos do agente do chat.
+Converte os eventos do LangChain em payloads para o cliente e decide se a
+resposta final pode ser reaproveitada (ex.: pelo cache de respostas).
+"""
+
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from infrastructure.pandas_sandbox import execucao_interrompida
+
+
+RESPOSTA_VAZIA = "Desculpe, não recebi uma resposta válida do agente."
+
+
+async def transmitir_eventos(agente: Any, mensagem: str,
+                             ao_concluir: Optional[Callable[[str], None]] = None) -> AsyncIterator[Dict[str, str]]:
+    """
+    Executa o agente repassando cada evento assim que é produzido.
+
+    Tokens do LLM viram payloads {'content': ...} e o uso de ferramentas
+    vira {'status': ...}, para o cliente saber que o agente está trabalhando.
+
+    Args:
+        agente: Agente LangChain (com astream_events)
+        mensagem: Entrada do agente
+        ao_concluir: Recebe a resposta completa ao final, só se ela for
+            confiável: não vazia e sem nenhuma execução de código interrompida
+            (tempo, memória, processo morto ou pool encerrado)
+    """
+    texto_em_stream = False
+    saida_final = None
+    partes = []
+    confiavel = True
+
+    async for evento in agente.astream_events({"input": mensagem}, version="v2"):
+        tipo = evento["event"]
+
+        if tipo == "on_chat_model_stream":
+            conteudo = evento["data"]["chunk"].content
+            if isinstance(conteudo, str) and conteudo:
+                texto_em_stream = True
+                partes.append(conteudo)
+                yield {'content': conteudo}
+
+        elif tipo == "on_tool_start":
+            # Separa o texto já enviado do que o LLM escrever depois da ferramenta
+            if texto_em_stream:
+                partes.append("\n\n")
+                yield {'content': "\n\n"}
+                texto_em_stream = False
+            yield {'status': "Executando código pandas..."}
+
+        elif tipo == "on_tool_end":
+            saida = evento["data"].get("output")
+            if execucao_interrompida(str(getattr(saida, "content", saida))):
+                confiavel = False
+
+        elif tipo == "on_chain_end" and not evento.get("parent_ids"):
+            saida_final = evento["data"].get("output")
+
+    # Modelos sem suporte a streaming: envia a resposta final de uma vez
+    if not texto_em_stream:
+        resposta = saida_final.get("output") if isinstance(saida_final, dict) else None
+        if not resposta or not resposta.strip():
+            resposta = RESPOSTA_VAZIA
+            confiavel = False
+        partes.append(resposta)
+        yield {'content': resposta}
+
+    resposta = ''.join(partes)
+    if ao_concluir is not None and confiavel and resposta.strip():
+        ao_concluir(resposta)
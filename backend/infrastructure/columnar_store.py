@@ -0,0 +1,88 @@
+"""
+Infrastructure Layer - Armazenamento colunar append-only das transações.
+Permite ingerir extratos grandes em blocos sem manter tudo em memória.
+"""
+
+import shutil
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+class ArmazemColunar:
+    """
+    Diretório de arquivos Parquet escritos bloco a bloco.
+
+    Cada bloco vira um row group da parte aberta; depois de fechar(),
+    um novo anexar() abre a parte seguinte, então o histórico já gravado
+    nunca é reescrito. O schema é fixado pelo primeiro bloco e os
+    seguintes são convertidos para ele, o que evita divergências quando
+    um bloco tem uma coluna de texto inteiramente vazia.
+    """
+
+    def __init__(self, diretorio: str):
+        """
+        Inicializa o armazém.
+
+        Args:
+            diretorio: Diretório das partes Parquet (deve estar vazio ou não existir)
+        """
+        self.diretorio = Path(diretorio)
+        self.num_linhas = 0
+        self._num_partes = 0
+        self._schema: Optional[pa.Schema] = None
+        self._writer: Optional[pq.ParquetWriter] = None
+
+    def anexar(self, df: pd.DataFrame) -> None:
+        """Acrescenta um bloco de linhas ao final do armazém."""
+        if df.empty:
+            return
+
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+
+        if self._schema is None:
+            # Colunas sem nenhum valor no primeiro bloco viram texto
+            self._schema = pa.schema([
+                campo.with_type(pa.string()) if pa.types.is_null(campo.type) else campo
+                for campo in tabela.schema
+            ]).remove_metadata()
+
+        if self._writer is None:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            parte = self.diretorio / f"parte-{self._num_partes:05d}.parquet"
+            self._writer = pq.ParquetWriter(parte, self._schema)
+            self._num_partes += 1
+
+        self._writer.write_table(tabela.select(self._schema.names).cast(self._schema))
+        self.num_linhas += len(df)
+
+    def fechar(self) -> None:
+        """Finaliza a parte aberta; necessário antes de ler o armazém."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _partes(self) -> list[Path]:
+        return sorted(self.diretorio.glob('parte-*.parquet'))
+
+    def ler(self) -> pd.DataFrame:
+        """Materializa o armazém inteiro em um DataFrame."""
+        partes = self._partes()
+        if not partes:
+            return pd.DataFrame()
+        return pd.concat([pd.read_parquet(parte) for parte in partes], ignore_index=True)
+
+    def iterar_blocos(self) -> Iterator[pd.DataFrame]:
+        """Lê o armazém de volta, um bloco (row group) por vez."""
+        for parte in self._partes():
+            arquivo = pq.ParquetFile(parte)
+            for i in range(arquivo.num_row_groups):
+                yield arquivo.read_row_group(i).to_pandas()
+
+    def remover(self) -> None:
+        """Fecha o armazém e apaga o diretório com as partes."""
+        self.fechar()
+        shutil.rmtree(self.diretorio, ignore_errors=True)
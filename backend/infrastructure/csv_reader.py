@@ -2,14 +2,58 @@
 Infrastructure Layer - Leitura e processamento do CSV do C6 Bank.
 """
 
+import codecs
 import pandas as pd
 import chardet
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, Optional, Tuple
 from datetime import datetime
 
-from domain.entities import Transacao, TipoTransacao
+from domain.entities import TransacaoBatch
 from domain.categorizer import CategorizadorTransacao
+from domain.money import CENTAVOS_POR_REAL, para_centavos
+from infrastructure.statement_cache import CacheExtrato
+
+
+# Colunas de texto com poucos valores distintos: sempre categóricas
+COLUNAS_CATEGORICAS = ['Tipo', 'Categoria', 'Mes_Ano']
+# Texto livre vira categórico quando os valores se repetem o bastante
+COLUNAS_TEXTO = ['Titulo', 'Descricao']
+PROPORCAO_MAX_DISTINTOS = 0.5
+TIPOS_INTEIROS = {'Mes': 'int8', 'Ano': 'int16'}
+
+
+def compactar_tipos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte o DataFrame de análise para tipos compactos.
+    
+    Categoria, tipo e mês viram Categorical; título e descrição também,
+    se repetem o bastante (estabelecimentos recorrentes), e senão ficam
+    como texto Arrow; mês e ano usam inteiros pequenos.
+    """
+    tipos = {coluna: 'category' for coluna in COLUNAS_CATEGORICAS if coluna in df.columns}
+    for coluna in COLUNAS_TEXTO:
+        if coluna not in df.columns:
+            continue
+        if df[coluna].nunique() <= len(df) * PROPORCAO_MAX_DISTINTOS:
+            tipos[coluna] = 'category'
+        elif df[coluna].dtype == object:
+            tipos[coluna] = pd.StringDtype('pyarrow')
+    tipos.update({coluna: tipo for coluna, tipo in TIPOS_INTEIROS.items() if coluna in df.columns})
+    return df.astype(tipos)
+
+
+def normalizar_titulos(titulos: pd.Series) -> pd.Series:
+    """
+    Forma normalizada do título (minúsculas, espaços colapsados), usada para
+    agrupar o mesmo estabelecimento ou destinatário escrito de jeitos diferentes.
+    """
+    return titulos.astype(str).str.lower().str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def uso_memoria(df: pd.DataFrame) -> Dict[str, int]:
+    """Bytes ocupados por coluna, contando o conteúdo dos textos."""
+    return {str(coluna): int(total) for coluna, total in df.memory_usage(deep=True, index=False).items()}
 
 
 class C6BankCSVReader:
@@ -31,37 +75,128 @@ class C6BankCSVReader:
         'Saldo do Dia(R$)'
     ]
     
-    def __init__(self, caminho_csv: str):
+    # Tamanho da amostra inicial usada para detectar encoding e cabeçalho
+    TAMANHO_AMOSTRA = 64 * 1024
+    
+    # BOMs conhecidos: (bytes, encoding para ler o conteúdo após o BOM)
+    BOMS = [
+        (codecs.BOM_UTF8, 'utf-8'),
+        (codecs.BOM_UTF16_LE, 'utf-16-le'),
+        (codecs.BOM_UTF16_BE, 'utf-16-be'),
+    ]
+    
+    def __init__(self, caminho_csv: str, cache: Optional[CacheExtrato] = None):
         """
         Inicializa o leitor com o caminho do arquivo CSV.
         
         Args:
             caminho_csv: Caminho para o arquivo CSV do extrato C6
+            cache: Cache em disco do DataFrame de análise (opcional)
         """
         self.caminho_csv = Path(caminho_csv)
+        self._cache = cache
         self._df: Optional[pd.DataFrame] = None
-        self._transacoes: Optional[list[Transacao]] = None
+        self._transacoes: Optional[TransacaoBatch] = None
     
-    def _detectar_encoding(self) -> str:
-        """Detecta automaticamente o encoding do arquivo."""
-        with open(self.caminho_csv, 'rb') as f:
-            resultado = chardet.detect(f.read())
-        return resultado.get('encoding', 'utf-8')
+    def _detectar_encoding(self, amostra: bytes, completa: bool) -> Tuple[str, int]:
+        """
+        Detecta o encoding a partir de uma amostra do início do arquivo.
+        
+        Args:
+            amostra: Bytes do início do arquivo
+            completa: Se a amostra contém o arquivo inteiro
+            
+        Returns:
+            Tupla com (encoding, tamanho do BOM a ser pulado)
+        """
+        for bom, encoding in self.BOMS:
+            if amostra.startswith(bom):
+                return encoding, len(bom)
+        
+        # Caminho rápido: UTF-8 válido (ignorando um caractere cortado no fim da amostra)
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(amostra, final=completa)
+            return 'utf-8', 0
+        except UnicodeDecodeError:
+            pass
+        
+        # Detector incremental: para assim que tiver confiança suficiente
+        detector = chardet.UniversalDetector()
+        for inicio in range(0, len(amostra), 4096):
+            detector.feed(amostra[inicio:inicio + 4096])
+            if detector.done:
+                break
+        detector.close()
+        return detector.result.get('encoding') or 'utf-8', 0
     
-    def _encontrar_linha_cabecalho(self) -> int:
+    def _farejar_arquivo(self, tamanho_amostra: Optional[int]) -> Tuple[str, int]:
         """
-        Encontra a linha onde começa o cabeçalho dos dados.
+        Detecta encoding e posição do cabeçalho dos dados em uma única leitura.
         O extrato C6 tem informações do banco nas primeiras linhas.
-        """
-        encoding = self._detectar_encoding()
         
-        with open(self.caminho_csv, 'r', encoding=encoding) as f:
-            for i, linha in enumerate(f):
-                if 'Data Lançamento' in linha:
-                    return i
+        Args:
+            tamanho_amostra: Bytes usados na detecção de encoding (None = arquivo inteiro)
+            
+        Returns:
+            Tupla com (encoding, offset em bytes da linha 'Data Lançamento')
+        """
+        with open(self.caminho_csv, 'rb') as f:
+            amostra = f.read() if tamanho_amostra is None else f.read(tamanho_amostra)
+            completa = tamanho_amostra is None or len(amostra) < tamanho_amostra
+            encoding, inicio_dados = self._detectar_encoding(amostra, completa)
+            
+            marcador = 'Data Lançamento'.encode(encoding, errors='replace')
+            quebra = '\n'.encode(encoding)
+            buffer = amostra
+            
+            # Normalmente o cabeçalho está na amostra; se não, continua lendo em blocos
+            posicao = buffer.find(marcador, inicio_dados)
+            while posicao < 0 and not completa:
+                bloco = f.read(self.TAMANHO_AMOSTRA)
+                if not bloco:
+                    break
+                buffer += bloco
+                posicao = buffer.find(marcador, inicio_dados)
         
         # Se não encontrou, assume que é a primeira linha
-        return 0
+        if posicao < 0:
+            return encoding, inicio_dados
+        
+        inicio_linha = buffer.rfind(quebra, inicio_dados, posicao)
+        if inicio_linha < 0:
+            return encoding, inicio_dados
+        return encoding, inicio_linha + len(quebra)
+    
+    def _ler_csv(self, tamanho_amostra: Optional[int]) -> pd.DataFrame:
+        """Lê o CSV a partir da linha de cabeçalho, sem reler o preâmbulo."""
+        encoding, offset = self._farejar_arquivo(tamanho_amostra)
+        
+        # Formato americano: ponto como decimal (300.00 = trezentos reais)
+        with open(self.caminho_csv, 'rb') as f:
+            f.seek(offset)
+            return pd.read_csv(f, encoding=encoding)
+    
+    def _ler_csv_em_blocos(self, linhas_por_bloco: int) -> Iterator[pd.DataFrame]:
+        """Lê o CSV em blocos de até linhas_por_bloco linhas."""
+        encoding, offset = self._farejar_arquivo(self.TAMANHO_AMOSTRA)
+        primeiro_bloco = True
+        
+        with open(self.caminho_csv, 'rb') as f:
+            f.seek(offset)
+            try:
+                for bloco in pd.read_csv(f, encoding=encoding, chunksize=linhas_por_bloco):
+                    primeiro_bloco = False
+                    yield bloco
+                return
+            except UnicodeDecodeError:
+                # Só dá para refazer a detecção se nada foi entregue ainda
+                if not primeiro_bloco:
+                    raise
+        
+        encoding, offset = self._farejar_arquivo(None)
+        with open(self.caminho_csv, 'rb') as f:
+            f.seek(offset)
+            yield from pd.read_csv(f, encoding=encoding, chunksize=linhas_por_bloco)
     
     def carregar(self) -> pd.DataFrame:
         """
@@ -73,96 +208,115 @@ class C6BankCSVReader:
         if self._df is not None:
             return self._df
         
-        encoding = self._detectar_encoding()
-        linha_cabecalho = self._encontrar_linha_cabecalho()
+        # Lê o CSV pulando as linhas de cabeçalho do banco. Se a amostra
+        # enganou a detecção de encoding, refaz a detecção com o arquivo inteiro
+        try:
+            df = self._ler_csv(self.TAMANHO_AMOSTRA)
+        except UnicodeDecodeError:
+            df = self._ler_csv(None)
         
-        # Lê o CSV pulando as linhas de cabeçalho do banco
-        # Formato americano: ponto como decimal (300.00 = trezentos reais)
-        self._df = pd.read_csv(
-            self.caminho_csv,
-            encoding=encoding,
-            skiprows=linha_cabecalho,
-        )
+        self._df = self._processar(df)
         
+        # Persiste o cache de categorização (no-op se não houver caminho configurado)
+        CategorizadorTransacao.cache.salvar()
+        
+        return self._df
+    
+    def ler_em_blocos(self, linhas_por_bloco: int) -> Iterator[pd.DataFrame]:
+        """
+        Lê o extrato em blocos já processados e no formato de análise.
+        
+        Cada bloco é convertido, categorizado e entregue sem que o arquivo
+        inteiro seja mantido em memória.
+        
+        Args:
+            linhas_por_bloco: Número máximo de linhas por bloco
+            
+        Returns:
+            Iterador de DataFrames no mesmo formato de obter_dataframe_para_analise()
+        """
+        for bloco in self._ler_csv_em_blocos(linhas_por_bloco):
+            bloco = self._processar(bloco)
+            if len(bloco):
+                yield self._preparar_para_analise(bloco)
+        
+        CategorizadorTransacao.cache.salvar()
+    
+    def _processar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converte tipos, remove linhas inválidas e categoriza as transações."""
         # Renomeia colunas para padronizar
-        self._df.columns = self._df.columns.str.strip()
+        df.columns = df.columns.str.strip()
         
-        # Converte colunas de valores para numérico (formato americano - ponto é decimal)
+        # Converte colunas de valores para numérico (formato americano - ponto é decimal),
+        # normalizadas para centavos inteiros: os agregados somam em centavos sem perda
         for col in ['Entrada(R$)', 'Saída(R$)', 'Saldo do Dia(R$)']:
-            if col in self._df.columns:
-                self._df[col] = pd.to_numeric(
-                    self._df[col],
+            if col in df.columns:
+                valores = pd.to_numeric(
+                    df[col],
                     errors='coerce'
                 ).fillna(0)
+                df[col] = para_centavos(valores) / CENTAVOS_POR_REAL
         
         # Converte datas
         for col in ['Data Lançamento', 'Data Contábil']:
-            if col in self._df.columns:
-                self._df[col] = pd.to_datetime(
-                    self._df[col],
+            if col in df.columns:
+                df[col] = pd.to_datetime(
+                    df[col],
                     format='%d/%m/%Y',
                     errors='coerce'
                 )
         
         # Remove linhas sem data válida
-        self._df = self._df.dropna(subset=['Data Lançamento'])
+        df = df.dropna(subset=['Data Lançamento'])
         
         # Adiciona colunas de categorização
-        self._adicionar_categorias()
+        self._adicionar_categorias(df)
         
-        return self._df
+        return df
     
-    def _adicionar_categorias(self) -> None:
+    def _adicionar_categorias(self, df: pd.DataFrame) -> None:
         """Adiciona colunas de tipo e categoria às transações."""
-        tipos = []
-        categorias = []
-        
-        for _, row in self._df.iterrows():
-            tipo, categoria = CategorizadorTransacao.categorizar(
-                titulo=str(row.get('Título', '')),
-                descricao=str(row.get('Descrição', '')),
-                valor_entrada=float(row.get('Entrada(R$)', 0)),
-                valor_saida=float(row.get('Saída(R$)', 0))
-            )
-            tipos.append(tipo.value)
-            categorias.append(categoria.value)
-        
-        self._df['Tipo'] = tipos
-        self._df['Categoria'] = categorias
-    
-    def obter_transacoes(self) -> list[Transacao]:
+        vazio = pd.Series('', index=df.index)
+        zero = pd.Series(0.0, index=df.index)
+        
+        tipos, categorias = CategorizadorTransacao.categorizar_lote(
+            titulos=df.get('Título', vazio),
+            descricoes=df.get('Descrição', vazio),
+            entradas=df.get('Entrada(R$)', zero),
+            saidas=df.get('Saída(R$)', zero)
+        )
+        
+        df['Tipo'] = tipos
+        df['Categoria'] = categorias
+    
+    def obter_transacoes(self) -> TransacaoBatch:
         """
-        Retorna lista de objetos Transacao.
+        Retorna as transações em uma coleção colunar.
+        
+        Tipo e categoria vêm das colunas já calculadas em carregar();
+        objetos Transacao são criados sob demanda ao acessar a coleção.
         
         Returns:
-            Lista de entidades Transacao
+            TransacaoBatch com as entidades Transacao
         """
         if self._transacoes is not None:
             return self._transacoes
         
         df = self.carregar()
-        self._transacoes = []
-        
-        for _, row in df.iterrows():
-            tipo, categoria = CategorizadorTransacao.categorizar(
-                titulo=str(row.get('Título', '')),
-                descricao=str(row.get('Descrição', '')),
-                valor_entrada=float(row.get('Entrada(R$)', 0)),
-                valor_saida=float(row.get('Saída(R$)', 0))
-            )
-            
-            transacao = Transacao(
-                data_lancamento=row['Data Lançamento'],
-                data_contabil=row['Data Contábil'],
-                titulo=str(row.get('Título', '')),
-                descricao=str(row.get('Descrição', '')),
-                valor_entrada=float(row.get('Entrada(R$)', 0)),
-                valor_saida=float(row.get('Saída(R$)', 0)),
-                saldo_dia=float(row.get('Saldo do Dia(R$)', 0)),
-                tipo=tipo,
-                categoria=categoria
-            )
-            self._transacoes.append(transacao)
+        vazio = pd.Series('', index=df.index)
+        zero = pd.Series(0.0, index=df.index)
+        
+        self._transacoes = TransacaoBatch.de_colunas(
+            datas_lancamento=df['Data Lançamento'],
+            datas_contabeis=df['Data Contábil'],
+            titulos=df.get('Título', vazio).map(str),
+            descricoes=df.get('Descrição', vazio).map(str),
+            valores_entrada=df.get('Entrada(R$)', zero),
+            valores_saida=df.get('Saída(R$)', zero),
+            saldos_dia=df.get('Saldo do Dia(R$)', zero),
+            tipos=df['Tipo'],
+            categorias=df['Categoria']
+        )
         
         return self._transacoes
     
@@ -173,8 +327,22 @@ class C6BankCSVReader:
         Returns:
             DataFrame com colunas renomeadas para português claro
         """
-        df = self.carregar().copy()
+        if self._cache is not None:
+            chave = self._cache.chave(self.caminho_csv)
+            df = self._cache.carregar(chave)
+            if df is not None:
+                return df
         
+        # _preparar_para_analise não altera o DataFrame carregado (rename cria outro)
+        df = compactar_tipos(self._preparar_para_analise(self.carregar()))
+        
+        if self._cache is not None:
+            self._cache.salvar(chave, df)
+        
+        return df
+    
+    def _preparar_para_analise(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Renomeia colunas e adiciona as colunas derivadas de data."""
         # Renomeia colunas para serem mais claras
         df = df.rename(columns={
             'Data Lançamento': 'Data',
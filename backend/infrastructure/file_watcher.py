@@ -0,0 +1,86 @@
+"""
+Infrastructure Layer - Observação dos arquivos de extrato.
+Detecta quando um extrato é substituído, adicionado ou removido, para
+que a API recarregue os dados sem precisar ser reiniciada.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Tuple
+
+
+# Estado observado: (caminho, mtime em ns, tamanho) de cada arquivo
+Assinatura = Tuple[Tuple[str, int, int], ...]
+
+
+class ObservadorArquivos:
+    """
+    Observa um conjunto de arquivos por polling de mtime e tamanho.
+
+    Uma mudança só é notificada depois que o estado fica igual em duas
+    verificações seguidas, para não disparar a recarga no meio da cópia
+    de um arquivo grande. O callback roda na thread do observador.
+    """
+
+    def __init__(self, listar: Callable[[], Iterable[Path]], ao_mudar: Callable[[], None],
+                 intervalo_s: float = 5.0):
+        """
+        Inicializa o observador.
+
+        Args:
+            listar: Retorna os arquivos a observar (chamado a cada verificação)
+            ao_mudar: Chamado quando o conjunto de arquivos muda
+            intervalo_s: Intervalo entre verificações
+        """
+        self._listar = listar
+        self._ao_mudar = ao_mudar
+        self.intervalo_s = intervalo_s
+        self.mudancas = 0
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._assinatura: Optional[Assinatura] = None
+
+    def assinatura(self) -> Assinatura:
+        """Estado atual dos arquivos observados."""
+        estado = []
+        for arquivo in self._listar():
+            try:
+                info = os.stat(arquivo)
+            except FileNotFoundError:
+                continue
+            estado.append((str(arquivo), info.st_mtime_ns, info.st_size))
+        return tuple(sorted(estado))
+
+    def iniciar(self) -> None:
+        """Registra o estado atual e começa a observar em segundo plano."""
+        self._assinatura = self.assinatura()
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name='observador-extrato', daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        pendente: Optional[Assinatura] = None
+        while not self._parar.wait(self.intervalo_s):
+            atual = self.assinatura()
+            if atual == self._assinatura:
+                pendente = None
+                continue
+            # Espera o arquivo parar de mudar antes de notificar
+            if atual != pendente:
+                pendente = atual
+                continue
+
+            self._assinatura = atual
+            pendente = None
+            self.mudancas += 1
+            try:
+                self._ao_mudar()
+            except Exception as e:
+                print(f"[WATCHER] Falha ao processar a mudança do extrato: {e}")
+
+    def encerrar(self) -> None:
+        """Para de observar."""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.intervalo_s)
@@ -0,0 +1,158 @@
+"""
+Infrastructure Layer - Agendador das execuções do agente LLM.
+Limita quantas execuções rodam ao mesmo tempo, recusa novas quando a fila
+está cheia e junta perguntas idênticas feitas ao mesmo tempo em uma só.
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List
+
+
+class FilaCheia(Exception):
+    """Não há espaço na fila de execuções; o cliente deve tentar de novo depois."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Fila de execuções cheia; tente novamente em {retry_after}s")
+        self.retry_after = retry_after
+
+
+class _Execucao:
+    """Uma execução em andamento; cada interessado recebe todos os eventos desde o início."""
+
+    def __init__(self):
+        self.eventos: List[Dict[str, Any]] = []
+        self.concluida = False
+        self._novo_evento = asyncio.Event()
+
+    def publicar(self, evento: Dict[str, Any]) -> None:
+        self.eventos.append(evento)
+        self._novo_evento.set()
+
+    def finalizar(self) -> None:
+        self.concluida = True
+        self._novo_evento.set()
+
+    async def acompanhar(self) -> AsyncIterator[Dict[str, Any]]:
+        posicao = 0
+        while True:
+            while posicao < len(self.eventos):
+                yield self.eventos[posicao]
+                posicao += 1
+            if self.concluida:
+                return
+            self._novo_evento.clear()
+            await self._novo_evento.wait()
+
+
+class AgendadorLLM:
+    """
+    Agendador assíncrono das execuções do agente.
+
+    - No máximo max_concorrencia execuções rodam ao mesmo tempo; as demais
+      esperam na fila.
+    - Com max_fila execuções esperando, novas chamadas levantam FilaCheia,
+      com uma estimativa de quando tentar de novo.
+    - Chamadas com a mesma chave de uma execução em andamento não iniciam
+      outra: acompanham a existente e recebem os mesmos eventos.
+
+    Usado apenas a partir do event loop, então não precisa de lock.
+    """
+
+    def __init__(self, max_concorrencia: int = 4, max_fila: int = 16,
+                 duracao_estimada: float = 10.0):
+        """
+        Inicializa o agendador.
+
+        Args:
+            max_concorrencia: Execuções simultâneas permitidas
+            max_fila: Execuções que podem esperar por uma vaga
+            duracao_estimada: Duração inicial (s) usada para estimar o Retry-After
+        """
+        self.max_concorrencia = max_concorrencia
+        self.max_fila = max_fila
+        self.duracao_media = duracao_estimada
+        self.executando = 0
+        self.concluidas = 0
+        self.coalescidas = 0
+        self.rejeitadas = 0
+        self._semaforo = asyncio.Semaphore(max_concorrencia)
+        self._em_andamento: Dict[Hashable, _Execucao] = {}
+        # Guarda referência às tasks para que não sejam coletadas antes do fim
+        self._tarefas: set = set()
+
+    @property
+    def pendentes(self) -> int:
+        """Execuções na fila ou rodando."""
+        return len(self._em_andamento)
+
+    def executar(self, chave: Hashable,
+                 produzir: Callable[[], AsyncIterator[Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Agenda a execução (ou se junta a uma idêntica em andamento).
+
+        Args:
+            chave: Identifica execuções equivalentes (ex.: versão dos dados + pergunta normalizada)
+            produzir: Cria o gerador assíncrono de eventos da execução
+
+        Returns:
+            Iterador com todos os eventos da execução
+
+        Raises:
+            FilaCheia: Se a fila estiver cheia
+        """
+        execucao = self._em_andamento.get(chave)
+        if execucao is not None:
+            self.coalescidas += 1
+        else:
+            if self.pendentes >= self.max_concorrencia + self.max_fila:
+                self.rejeitadas += 1
+                raise FilaCheia(self._estimar_retry_after())
+
+            execucao = _Execucao()
+            self._em_andamento[chave] = execucao
+            tarefa = asyncio.create_task(self._rodar(chave, execucao, produzir))
+            self._tarefas.add(tarefa)
+            tarefa.add_done_callback(self._tarefas.discard)
+
+        return execucao.acompanhar()
+
+    async def _rodar(self, chave: Hashable, execucao: _Execucao,
+                     produzir: Callable[[], AsyncIterator[Dict[str, Any]]]) -> None:
+        """Roda a execução quando houver vaga, publicando cada evento."""
+        try:
+            async with self._semaforo:
+                self.executando += 1
+                inicio = time.monotonic()
+                try:
+                    async for evento in produzir():
+                        execucao.publicar(evento)
+                finally:
+                    self.executando -= 1
+                    # Média móvel da duração, usada no Retry-After
+                    self.duracao_media = 0.8 * self.duracao_media + 0.2 * (time.monotonic() - inicio)
+        except Exception as e:
+            execucao.publicar({'error': f"Erro ao processar: {str(e)}"})
+        finally:
+            self.concluidas += 1
+            self._em_andamento.pop(chave, None)
+            execucao.finalizar()
+
+    def _estimar_retry_after(self) -> int:
+        """Segundos até uma vaga provável na fila."""
+        rodadas = math.ceil(self.pendentes / self.max_concorrencia)
+        return max(1, math.ceil(rodadas * self.duracao_media))
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna os contadores do agendador."""
+        return {
+            'executando': self.executando,
+            'na_fila': self.pendentes - self.executando,
+            'max_concorrencia': self.max_concorrencia,
+            'max_fila': self.max_fila,
+            'concluidas': self.concluidas,
+            'coalescidas': self.coalescidas,
+            'rejeitadas': self.rejeitadas,
+            'duracao_media_s': round(self.duracao_media, 3),
+        }
@@ -0,0 +1,143 @@
+"""
+Infrastructure Layer - Leitura de vários extratos do C6 Bank de uma vez.
+Processa os arquivos em paralelo e remove transações repetidas entre
+extratos cujos períodos se sobrepõem.
+"""
+
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.csv_reader import C6BankCSVReader, compactar_tipos
+from infrastructure.statement_cache import CacheExtrato
+
+
+# Colunas que identificam uma transação para fins de deduplicação
+COLUNAS_IDENTIDADE = ['Data', 'Titulo', 'Descricao', 'Entrada', 'Saida']
+
+
+def _ler_extrato(caminho: Path, cache: Optional[CacheExtrato]) -> pd.DataFrame:
+    """Lê um único extrato (executado nos processos do pool)."""
+    return C6BankCSVReader(str(caminho), cache=cache).obter_dataframe_para_analise()
+
+
+def hash_transacoes(df: pd.DataFrame) -> np.ndarray:
+    """Calcula o hash de identidade (data, título, descrição e valores) de cada linha."""
+    # Tipos fixos para que o hash não dependa da origem (CSV ou cache Parquet)
+    identidade = df[COLUNAS_IDENTIDADE].astype({
+        'Data': 'datetime64[ns]',
+        'Titulo': object,
+        'Descricao': object,
+        'Entrada': 'float64',
+        'Saida': 'float64',
+    })
+    return pd.util.hash_pandas_object(identidade, index=False).to_numpy()
+
+
+class C6BankMultiCSVReader:
+    """
+    Leitor de um conjunto de extratos CSV do C6 Bank (diretório ou glob).
+
+    Uma transação repetida em dois extratos (períodos sobrepostos) é
+    mantida uma única vez. Transações idênticas dentro do mesmo extrato
+    (ex.: dois cafés iguais no mesmo dia) são preservadas: para cada
+    transação vale o maior número de ocorrências visto em um único arquivo.
+    """
+
+    def __init__(self, padrao: str, cache: Optional[CacheExtrato] = None,
+                 max_processos: Optional[int] = None):
+        """
+        Inicializa o leitor.
+
+        Args:
+            padrao: Diretório com arquivos .csv ou padrão glob (ex.: 'extratos/*.csv')
+            cache: Cache em disco dos extratos processados (opcional)
+            max_processos: Número máximo de processos de leitura (padrão: nº de CPUs)
+        """
+        self.padrao = padrao
+        self._cache = cache
+        self._max_processos = max_processos
+
+    @staticmethod
+    def eh_multiplo(caminho: str) -> bool:
+        """Indica se o caminho é um diretório ou um padrão glob."""
+        return os.path.isdir(caminho) or glob.has_magic(caminho)
+
+    def listar_arquivos(self) -> list[Path]:
+        """Lista os extratos em ordem de nome (normalmente cronológica)."""
+        if os.path.isdir(self.padrao):
+            return sorted(Path(self.padrao).glob('*.csv'))
+        return sorted(Path(caminho) for caminho in glob.glob(self.padrao))
+
+    def obter_dataframe_para_analise(self) -> pd.DataFrame:
+        """
+        Lê todos os extratos em paralelo e junta em um único DataFrame.
+
+        Returns:
+            DataFrame no formato de C6BankCSVReader.obter_dataframe_para_analise,
+            ordenado por data e sem as transações duplicadas entre extratos
+        """
+        arquivos = self.listar_arquivos()
+        if not arquivos:
+            raise FileNotFoundError(f"Nenhum extrato encontrado em {self.padrao}")
+
+        if len(arquivos) == 1:
+            frames = [_ler_extrato(arquivos[0], self._cache)]
+        else:
+            processos = min(len(arquivos), self._max_processos or os.cpu_count() or 1)
+            # fork copiaria as threads e locks da API (ex.: o lock do serviço)
+            metodos = multiprocessing.get_all_start_methods()
+            contexto = multiprocessing.get_context('forkserver' if 'forkserver' in metodos else 'spawn')
+            with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as pool:
+                frames = list(pool.map(_ler_extrato, arquivos, repeat(self._cache)))
+
+        return self._juntar(frames)
+
+    def ler_em_blocos(self, linhas_por_bloco: int) -> Iterator[pd.DataFrame]:
+        """
+        Lê os extratos em sequência e em blocos, removendo sobreposições.
+
+        Mantém em memória apenas um bloco e a contagem de ocorrências por
+        hash de transação.
+        """
+        ja_emitidas: Dict[int, int] = {}
+
+        for arquivo in self.listar_arquivos():
+            ocorrencias_arquivo: Dict[int, int] = {}
+
+            for bloco in C6BankCSVReader(str(arquivo)).ler_em_blocos(linhas_por_bloco):
+                manter = np.zeros(len(bloco), dtype=bool)
+                for i, chave in enumerate(hash_transacoes(bloco).tolist()):
+                    ocorrencia = ocorrencias_arquivo.get(chave, 0) + 1
+                    ocorrencias_arquivo[chave] = ocorrencia
+                    manter[i] = ocorrencia > ja_emitidas.get(chave, 0)
+                if manter.any():
+                    yield bloco[manter]
+
+            for chave, ocorrencias in ocorrencias_arquivo.items():
+                if ocorrencias > ja_emitidas.get(chave, 0):
+                    ja_emitidas[chave] = ocorrencias
+
+    @staticmethod
+    def _juntar(frames: list[pd.DataFrame]) -> pd.DataFrame:
+        """Concatena os extratos removendo transações repetidas entre arquivos."""
+        marcados = []
+        for df in frames:
+            df = df.copy()
+            df['_hash'] = hash_transacoes(df)
+            # Numera as ocorrências de cada transação dentro do próprio arquivo
+            df['_ocorrencia'] = df.groupby('_hash').cumcount()
+            marcados.append(df)
+
+        juntos = pd.concat(marcados, ignore_index=True)
+        juntos = juntos.drop_duplicates(subset=['_hash', '_ocorrencia'])
+        juntos = juntos.drop(columns=['_hash', '_ocorrencia'])
+        # A concatenação perde os Categorical quando as categorias diferem entre arquivos
+        return compactar_tipos(juntos.sort_values('Data', kind='stable').reset_index(drop=True))
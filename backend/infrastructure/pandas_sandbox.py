@@ -0,0 +1,333 @@
+"""
+Infrastructure Layer - Execução isolada do código pandas gerado pelo agente.
+O código roda em processos de trabalho pré-iniciados, com limite de tempo
+e de memória, para que uma consulta descontrolada não trave a API.
+"""
+
+import ast
+import contextvars
+import multiprocessing
+import queue
+import re
+import tempfile
+import threading
+from contextlib import contextmanager, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.shared_dataset import carregar_arrow, salvar_arrow
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def executar_codigo(codigo: str, namespace: Dict[str, Any]) -> str:
+    """
+    Executa o código como a ferramenta Python do agente: todas as
+    instruções, e devolve o valor da última expressão ou o que foi impresso.
+    MemoryError não vira texto: o worker precisa saber que estourou o limite.
+    """
+    # Mesma limpeza que a ferramenta do LangChain faz na entrada do LLM
+    codigo = re.sub(r'^(\s|`)*(?i:python)?\s*', '', codigo)
+    codigo = re.sub(r'(\s|`)*$', '', codigo)
+
+    try:
+        arvore = ast.parse(codigo)
+        exec(ast.unparse(ast.Module(arvore.body[:-1], type_ignores=[])), namespace)
+        ultima = ast.unparse(ast.Module(arvore.body[-1:], type_ignores=[]))
+        saida = StringIO()
+        try:
+            with redirect_stdout(saida):
+                resultado = eval(ultima, namespace)
+            return saida.getvalue() if resultado is None else str(resultado)
+        except MemoryError:
+            raise
+        except Exception:
+            with redirect_stdout(saida):
+                exec(ultima, namespace)
+            return saida.getvalue()
+    except MemoryError:
+        raise
+    except Exception as e:
+        return f"{type(e).__name__}: {str(e)}"
+
+
+# Início das saídas de execuções interrompidas pelo pool (tempo, memória,
+# processo morto ou pool encerrado), diferentes de um erro no código do agente
+PREFIXOS_INTERRUPCAO = (
+    'TimeoutError: a execução',
+    'MemoryError: o código',
+    'Erro: o processo de execução',
+    'Erro: o ambiente de execução',
+)
+
+
+def execucao_interrompida(saida: str) -> bool:
+    """Indica se a saída é de uma execução interrompida pelo pool."""
+    return saida.startswith(PREFIXOS_INTERRUPCAO)
+
+
+def _loop_worker(conexao, caminho_arrow: str, memoria_mb: int) -> None:
+    """Processo de trabalho: carrega o DataFrame uma vez e executa os pedidos."""
+    if resource is not None and memoria_mb:
+        limite = memoria_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+
+    # Cópias rasas protegem o DataFrame original de alterações do agente
+    pd.set_option('mode.copy_on_write', True)
+    df = carregar_arrow(Path(caminho_arrow))
+    namespace: Optional[Dict[str, Any]] = None
+
+    while True:
+        try:
+            comando, codigo = conexao.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+
+        if comando == 'reiniciar':
+            namespace = None
+            continue
+
+        if namespace is None:
+            namespace = {'df': df.copy(deep=False), 'pd': pd, 'np': np}
+        try:
+            resultado = executar_codigo(codigo, namespace)
+        except MemoryError:
+            namespace = None
+            resultado = f"MemoryError: o código excedeu o limite de {memoria_mb} MB"
+        conexao.send(resultado)
+
+
+class _Worker:
+    """Um processo de trabalho e a conexão com ele."""
+
+    def __init__(self, contexto, caminho_arrow: Path, memoria_mb: int):
+        self.conexao, conexao_filho = contexto.Pipe()
+        self.processo = contexto.Process(
+            target=_loop_worker, args=(conexao_filho, str(caminho_arrow), memoria_mb), daemon=True
+        )
+        self.processo.start()
+        conexao_filho.close()
+
+    def executar(self, codigo: str, timeout: float) -> str:
+        """Executa o código; levanta TimeoutError se o limite de tempo estourar."""
+        self.conexao.send(('executar', codigo))
+        if not self.conexao.poll(timeout):
+            raise TimeoutError
+        return self.conexao.recv()
+
+    def reiniciar_sessao(self) -> None:
+        self.conexao.send(('reiniciar', None))
+
+    def encerrar(self) -> None:
+        self.conexao.close()
+        self.processo.terminate()
+        self.processo.join(timeout=1)
+        if self.processo.is_alive():
+            self.processo.kill()
+            self.processo.join()
+
+
+# Sessão do agente em execução no contexto atual (uma por pergunta)
+_sessao_atual: contextvars.ContextVar[Optional['_Sessao']] = contextvars.ContextVar(
+    'sessao_pandas', default=None
+)
+
+
+def executor_da_sessao() -> Optional['ExecutorPandasIsolado']:
+    """Executor da sessão aberta no contexto atual, ou None fora de uma sessão."""
+    sessao = _sessao_atual.get()
+    return sessao.executor if sessao is not None else None
+
+
+class _Sessao:
+    """
+    Sequência de execuções de uma mesma pergunta. Usa sempre o mesmo
+    worker, para que variáveis criadas em um passo existam no seguinte.
+    """
+
+    def __init__(self, executor: 'ExecutorPandasIsolado'):
+        self.executor = executor
+        self.worker: Optional[_Worker] = None
+
+    def executar(self, codigo: str) -> str:
+        if self.worker is None:
+            try:
+                self.worker = self.executor._adquirir()
+            except RuntimeError:
+                return "Erro: o ambiente de execução foi encerrado (os dados foram recarregados). Tente novamente."
+        try:
+            return self.worker.executar(codigo, self.executor.timeout_s)
+        except TimeoutError:
+            self.executor._reciclar(self.worker)
+            self.worker = None
+            return (
+                f"TimeoutError: a execução passou do limite de {self.executor.timeout_s:g}s e foi "
+                "interrompida. Use uma consulta mais simples."
+            )
+        except (EOFError, OSError):
+            self.executor._reciclar(self.worker)
+            self.worker = None
+            return "Erro: o processo de execução foi encerrado (provavelmente por falta de memória)."
+
+    def liberar(self) -> None:
+        if self.worker is not None:
+            self.executor._devolver(self.worker)
+            self.worker = None
+
+
+class ExecutorPandasIsolado:
+    """
+    Pool de processos que executam o código pandas do agente.
+
+    Os workers são iniciados de antemão e abrem o DataFrame a partir de um
+    arquivo Arrow mapeado em memória. Cada chamada tem limite de tempo
+    (o worker que estoura é morto e substituído em segundo plano) e cada
+    worker tem limite de memória.
+    """
+
+    # Intervalo com que quem espera um worker livre confere o encerramento
+    ESPERA_S = 0.5
+
+    def __init__(self, df: Optional[pd.DataFrame], num_workers: int = 2, timeout_s: float = 20.0,
+                 memoria_mb: int = 2048, diretorio: Optional[str] = None,
+                 arquivo_arrow: Optional[Path] = None):
+        """
+        Inicializa o pool e inicia os workers.
+
+        Args:
+            df: DataFrame de análise disponível como `df` no código do agente
+            num_workers: Número de processos de trabalho
+            timeout_s: Tempo máximo de cada execução
+            memoria_mb: Limite de memória de cada worker (0 para não limitar)
+            diretorio: Onde gravar o arquivo Arrow (padrão: diretório temporário)
+            arquivo_arrow: Arquivo Arrow já publicado com o DataFrame (ex.: o do
+                conjunto compartilhado); se informado, df não é gravado de novo
+        """
+        self.num_workers = num_workers
+        self.timeout_s = timeout_s
+        self.memoria_mb = memoria_mb
+        self.reciclados = 0
+        self._fechado = False
+        # None na fila avisa quem está esperando que o executor foi encerrado
+        self._livres: queue.Queue[Optional[_Worker]] = queue.Queue()
+
+        # O arquivo só é removido no encerramento se foi criado aqui
+        self._arquivo_proprio = arquivo_arrow is None
+        if arquivo_arrow is not None:
+            self.caminho_arrow = Path(arquivo_arrow)
+        else:
+            diretorio_arrow = Path(diretorio or tempfile.mkdtemp(prefix='sandbox_'))
+            diretorio_arrow.mkdir(parents=True, exist_ok=True)
+            self.caminho_arrow = diretorio_arrow / 'dados.arrow'
+            salvar_arrow(df, self.caminho_arrow)
+
+        # forkserver cria workers rapidamente sem herdar as threads da API
+        metodos = multiprocessing.get_all_start_methods()
+        self._contexto = multiprocessing.get_context('forkserver' if 'forkserver' in metodos else 'spawn')
+        if 'forkserver' in metodos:
+            self._contexto.set_forkserver_preload(['pandas', 'pyarrow', __name__])
+
+        for _ in range(num_workers):
+            self._livres.put(self._novo_worker())
+
+    def _novo_worker(self) -> _Worker:
+        return _Worker(self._contexto, self.caminho_arrow, self.memoria_mb)
+
+    @contextmanager
+    def sessao(self) -> Iterator[None]:
+        """Agrupa as execuções de uma pergunta no mesmo worker."""
+        sessao = _Sessao(self)
+        token = _sessao_atual.set(sessao)
+        try:
+            yield
+        finally:
+            _sessao_atual.reset(token)
+            sessao.liberar()
+
+    def executar(self, codigo: str) -> str:
+        """
+        Executa o código na sessão atual (ou em uma sessão avulsa).
+
+        Returns:
+            Resultado como texto, no formato da ferramenta Python do agente
+        """
+        sessao = _sessao_atual.get()
+        if sessao is not None and sessao.executor is self:
+            return sessao.executar(codigo)
+
+        sessao = _Sessao(self)
+        try:
+            return sessao.executar(codigo)
+        finally:
+            sessao.liberar()
+
+    def _adquirir(self) -> _Worker:
+        """Espera um worker livre; levanta RuntimeError se o executor for encerrado."""
+        while not self._fechado:
+            try:
+                worker = self._livres.get(timeout=self.ESPERA_S)
+            except queue.Empty:
+                continue
+            if worker is None:
+                # Repassa o aviso para o próximo que estiver esperando
+                self._livres.put(None)
+                break
+            if self._fechado:
+                worker.encerrar()
+                break
+            return worker
+        raise RuntimeError("Executor encerrado")
+
+    def _devolver(self, worker: _Worker) -> None:
+        if self._fechado:
+            worker.encerrar()
+            return
+        try:
+            worker.reiniciar_sessao()
+        except OSError:
+            self._reciclar(worker)
+            return
+        self._livres.put(worker)
+
+    def _reciclar(self, worker: _Worker) -> None:
+        """Mata o worker e inicia outro no lugar, sem bloquear quem chamou."""
+        self.reciclados += 1
+
+        def repor():
+            worker.encerrar()
+            if not self._fechado:
+                self._livres.put(self._novo_worker())
+
+        threading.Thread(target=repor, daemon=True).start()
+
+    def encerrar(self) -> None:
+        """Encerra os workers ociosos; os ocupados são encerrados ao serem devolvidos."""
+        self._fechado = True
+        while True:
+            try:
+                worker = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.encerrar()
+        # Acorda quem está esperando em _adquirir
+        self._livres.put(None)
+        if self._arquivo_proprio:
+            self.caminho_arrow.unlink(missing_ok=True)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Retorna os contadores do pool."""
+        return {
+            'workers': self.num_workers,
+            'livres': self._livres.qsize(),
+            'timeout_s': self.timeout_s,
+            'memoria_mb': self.memoria_mb,
+            'reciclados': self.reciclados,
+        }
@@ -0,0 +1,166 @@
+"""
+Infrastructure Layer - DataFrame de análise compartilhado entre processos.
+Um único processo lê o extrato e grava o DataFrame em Arrow IPC; os demais
+workers da API abrem o mesmo arquivo mapeado em memória, sem copiar.
+"""
+
+import hashlib
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from domain.categorizer import CategorizadorTransacao
+from infrastructure.statement_cache import hash_arquivo
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def salvar_arrow(df: pd.DataFrame, caminho: Path) -> None:
+    """Grava o DataFrame em um arquivo Arrow IPC, de forma atômica."""
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    temporario = caminho.with_suffix(f'.{os.getpid()}.tmp')
+    with pa.OSFile(str(temporario), 'wb') as destino:
+        with ipc.new_file(destino, tabela.schema) as writer:
+            writer.write_table(tabela)
+    os.replace(temporario, caminho)
+
+
+def carregar_arrow(caminho: Path) -> pd.DataFrame:
+    """
+    Abre um arquivo Arrow IPC mapeado em memória.
+
+    As colunas apontam direto para as páginas do arquivo (somente leitura),
+    então vários processos abrindo o mesmo arquivo compartilham a memória.
+    """
+    with pa.memory_map(str(caminho), 'r') as fonte:
+        tabela = ipc.open_file(fonte).read_all()
+    return tabela.to_pandas(split_blocks=True)
+
+
+class ConjuntoCompartilhado:
+    """
+    Diretório com as versões publicadas do DataFrame de análise.
+
+    Cada versão é um arquivo `<chave>.arrow` imutável; o arquivo ATUAL
+    aponta para a versão vigente e é trocado atomicamente. Processos que
+    já abriram uma versão antiga continuam lendo-a até recarregarem.
+    """
+
+    # Incrementar quando o layout do DataFrame de análise mudar
+    VERSAO_FORMATO = 2
+
+    # Versões mantidas no diretório (a atual e as anteriores ainda em uso)
+    MAX_VERSOES = 3
+
+    PONTEIRO = 'ATUAL'
+
+    def __init__(self, diretorio: str):
+        """
+        Inicializa o conjunto.
+
+        Args:
+            diretorio: Diretório compartilhado pelos workers (criado se não existir)
+        """
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def chave_fonte(cls, arquivos: Iterable[Path]) -> str:
+        """Identifica o conteúdo dos arquivos de origem e a versão das regras."""
+        digest = hashlib.sha256()
+        for arquivo in arquivos:
+            digest.update(hash_arquivo(arquivo).encode('utf-8'))
+        return f"{digest.hexdigest()[:32]}-{CategorizadorTransacao.VERSAO_REGRAS}-v{cls.VERSAO_FORMATO}"
+
+    def arquivo(self, chave: str) -> Path:
+        """Caminho do arquivo Arrow de uma versão."""
+        return self.diretorio / f"{chave}.arrow"
+
+    def versao_atual(self) -> Optional[str]:
+        """Chave da versão publicada, ou None se nada foi publicado."""
+        try:
+            chave = (self.diretorio / self.PONTEIRO).read_text(encoding='utf-8').strip()
+        except FileNotFoundError:
+            return None
+        return chave if chave and self.arquivo(chave).exists() else None
+
+    @contextmanager
+    def _trava(self) -> Iterator[None]:
+        # Lock de arquivo: só um processo lê o CSV e publica por vez
+        if fcntl is None:
+            yield
+            return
+        with open(self.diretorio / '.lock', 'w') as arquivo_lock:
+            fcntl.flock(arquivo_lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(arquivo_lock, fcntl.LOCK_UN)
+
+    def obter(self, chave: str, carregar: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """
+        Abre a versão indicada, publicando-a antes se ela ainda não existe.
+
+        Args:
+            chave: Chave da fonte (ver chave_fonte)
+            carregar: Produz o DataFrame de análise; só é chamado por um processo
+
+        Returns:
+            DataFrame mapeado no arquivo da versão
+        """
+        if self.versao_atual() != chave:
+            with self._trava():
+                # Outro processo pode ter publicado enquanto esperávamos o lock
+                if self.versao_atual() != chave:
+                    if self.arquivo(chave).exists():
+                        # Versão já gravada (ex.: o extrato voltou a uma versão
+                        # anterior): só volta a apontar para ela, sem reler o CSV
+                        self._apontar(chave)
+                    else:
+                        self._publicar(carregar(), chave)
+        return carregar_arrow(self.arquivo(chave))
+
+    def publicar(self, df: pd.DataFrame, chave: str) -> pd.DataFrame:
+        """
+        Publica uma nova versão e a torna a atual.
+
+        Returns:
+            O DataFrame reaberto a partir do arquivo publicado
+        """
+        with self._trava():
+            self._publicar(df, chave)
+        return carregar_arrow(self.arquivo(chave))
+
+    def _publicar(self, df: pd.DataFrame, chave: str) -> None:
+        if not self.arquivo(chave).exists():
+            salvar_arrow(df, self.arquivo(chave))
+        self._apontar(chave)
+
+    def _apontar(self, chave: str) -> None:
+        """Torna a versão (já gravada) a atual."""
+        # A poda usa o mtime: a versão atual passa a ser a mais recente
+        os.utime(self.arquivo(chave))
+        ponteiro = self.diretorio / self.PONTEIRO
+        temporario = ponteiro.with_suffix(f'.{os.getpid()}.tmp')
+        temporario.write_text(chave, encoding='utf-8')
+        os.replace(temporario, ponteiro)
+        self._podar()
+
+    def _podar(self) -> None:
+        """Remove as versões mais antigas além de MAX_VERSOES."""
+        arquivos = sorted(
+            self.diretorio.glob('*.arrow'),
+            key=lambda arquivo: arquivo.stat().st_mtime,
+            reverse=True
+        )
+        # Arquivos já mapeados por outros processos continuam válidos após o unlink
+        for antigo in arquivos[self.MAX_VERSOES:]:
+            antigo.unlink(missing_ok=True)
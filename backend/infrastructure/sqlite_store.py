@@ -0,0 +1,286 @@
+"""
+Infrastructure Layer - Armazenamento das transações em SQLite.
+Mantém o extrato em um banco local indexado, de modo que as consultas
+sobre transações individuais não exigem o histórico inteiro em memória
+e vários processos podem compartilhar a mesma cópia em disco.
+"""
+
+import hashlib
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from domain.categorizer import CategorizadorTransacao
+from domain.money import CENTAVOS_POR_REAL
+from infrastructure.csv_reader import normalizar_titulos
+from infrastructure.statement_cache import hash_arquivo
+
+
+TABELA = 'transacoes'
+
+# Título normalizado, gravado na importação; só existe no banco
+TITULO_NORMALIZADO = 'Titulo_Normalizado'
+
+# Colunas indexadas: filtros por data/mês, categoria e tipo, agrupamento por
+# título normalizado e ordenação pelos valores (maiores gastos/entradas)
+INDICES = ['Data', 'Mes_Ano', 'Categoria', 'Tipo', TITULO_NORMALIZADO, 'Saida', 'Entrada']
+
+
+def _centavos(coluna: str) -> str:
+    """Expressão SQL com o valor da coluna em centavos inteiros."""
+    return f'CAST(ROUND("{coluna}" * {CENTAVOS_POR_REAL}) AS INTEGER)'
+
+
+_CENTAVOS_ENTRADA = _centavos('Entrada')
+_CENTAVOS_SAIDA = _centavos('Saida')
+
+
+def _tipo_sql(dtype) -> str:
+    if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
+
+
+class ArmazemSQLite:
+    """
+    Banco SQLite com as transações no formato de análise.
+
+    O banco registra de quais arquivos (e de qual versão das regras de
+    categorização) veio o conteúdo; se a fonte não mudou, a carga do CSV é
+    pulada. A recarga acontece dentro de uma transação exclusiva, então
+    processos que sobem ao mesmo tempo não importam o extrato em dobro.
+    """
+
+    # Incrementar quando o layout da tabela mudar
+    VERSAO_FORMATO = 2
+
+    def __init__(self, caminho: str):
+        """
+        Inicializa o armazenamento.
+
+        Args:
+            caminho: Arquivo do banco SQLite (criado se não existir)
+        """
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        with self._conectar() as conexao:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+
+    @contextmanager
+    def _conectar(self) -> Iterator[sqlite3.Connection]:
+        # Uma conexão por operação: seguro entre threads e processos
+        conexao = sqlite3.connect(self.caminho, timeout=60, isolation_level=None)
+        try:
+            yield conexao
+        finally:
+            conexao.close()
+
+    @classmethod
+    def chave_fonte(cls, arquivos: Iterable[Path]) -> str:
+        """Identifica o conteúdo dos arquivos de origem e a versão das regras."""
+        digest = hashlib.sha256()
+        for arquivo in arquivos:
+            digest.update(hash_arquivo(arquivo).encode('utf-8'))
+        return f"{digest.hexdigest()[:32]}-{CategorizadorTransacao.VERSAO_REGRAS}-v{cls.VERSAO_FORMATO}"
+
+    def _meta(self, conexao: sqlite3.Connection, chave: str):
+        linha = conexao.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+    def _gravar_meta(self, conexao: sqlite3.Connection, chave: str, valor: str) -> None:
+        conexao.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave, valor))
+
+    def garantir_fonte(self, chave: str, blocos: Callable[[], Iterable[pd.DataFrame]]) -> bool:
+        """
+        Garante que o banco contém a fonte indicada, importando-a se preciso.
+
+        Args:
+            chave: Chave da fonte (ver chave_fonte)
+            blocos: Produz os blocos do DataFrame de análise a importar
+
+        Returns:
+            True se o extrato foi importado, False se o banco já estava atualizado
+        """
+        with self._conectar() as conexao:
+            if self._meta(conexao, 'fonte') == chave:
+                return False
+
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                # Outro processo pode ter importado enquanto esperávamos o lock
+                if self._meta(conexao, 'fonte') == chave:
+                    conexao.execute("COMMIT")
+                    return False
+
+                conexao.execute(f"DROP TABLE IF EXISTS {TABELA}")
+                self._gravar_meta(conexao, 'schema', '')
+                for bloco in blocos():
+                    self._inserir(conexao, bloco)
+                self._gravar_meta(conexao, 'fonte', chave)
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+        return True
+
+    def anexar(self, df: pd.DataFrame, chave: str) -> None:
+        """Acrescenta transações e registra a nova chave da fonte."""
+        with self._conectar() as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                self._inserir(conexao, df)
+                self._gravar_meta(conexao, 'fonte', chave)
+                conexao.execute("COMMIT")
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+
+    def _inserir(self, conexao: sqlite3.Connection, df: pd.DataFrame) -> None:
+        """Insere um bloco, criando a tabela e os índices no primeiro bloco."""
+        if df.empty:
+            return
+
+        schema = self._meta(conexao, 'schema')
+        if not schema:
+            colunas = ", ".join(f'"{c}" {_tipo_sql(df[c].dtype)}' for c in df.columns)
+            conexao.execute(
+                f"CREATE TABLE {TABELA} (id INTEGER PRIMARY KEY, {colunas}, \"{TITULO_NORMALIZADO}\" TEXT)"
+            )
+            for coluna in INDICES:
+                if coluna in df.columns or coluna == TITULO_NORMALIZADO:
+                    conexao.execute(f'CREATE INDEX idx_{coluna.lower()} ON {TABELA} ("{coluna}")')
+            schema = json.dumps({c: str(df[c].dtype) for c in df.columns})
+            self._gravar_meta(conexao, 'schema', schema)
+
+        colunas = list(json.loads(schema))
+        valores = df[colunas].copy()
+        valores[TITULO_NORMALIZADO] = normalizar_titulos(df['Titulo'])
+        colunas.append(TITULO_NORMALIZADO)
+        for coluna in colunas:
+            if pd.api.types.is_datetime64_any_dtype(valores[coluna]):
+                valores[coluna] = valores[coluna].dt.strftime('%Y-%m-%d %H:%M:%S')
+        valores = valores.astype(object).where(valores.notna(), None)
+
+        nomes = ", ".join(f'"{c}"' for c in colunas)
+        marcadores = ", ".join("?" for _ in colunas)
+        conexao.executemany(
+            f"INSERT INTO {TABELA} ({nomes}) VALUES ({marcadores})",
+            valores.itertuples(index=False, name=None)
+        )
+
+    def consultar(self, sql: str, parametros: Tuple = ()) -> pd.DataFrame:
+        """Executa uma consulta e devolve o resultado com os tipos originais."""
+        with self._conectar() as conexao:
+            df = pd.read_sql_query(sql, conexao, params=parametros)
+            schema = json.loads(self._meta(conexao, 'schema') or '{}')
+        return self._restaurar_tipos(df, schema)
+
+    @staticmethod
+    def _restaurar_tipos(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+        for coluna, dtype in schema.items():
+            if coluna not in df.columns:
+                continue
+            if dtype.startswith('datetime64'):
+                df[coluna] = pd.to_datetime(df[coluna]).astype(dtype)
+            else:
+                df[coluna] = df[coluna].astype(dtype)
+        return df
+
+    def ler(self) -> pd.DataFrame:
+        """Materializa todas as transações, na ordem de importação."""
+        df = self.consultar(f"SELECT * FROM {TABELA} ORDER BY id")
+        return df.drop(columns=['id', TITULO_NORMALIZADO])
+
+    def iterar_blocos(self, linhas_por_bloco: int = 100_000) -> Iterator[pd.DataFrame]:
+        """Lê as transações em blocos, sem materializar a tabela inteira."""
+        ultimo_id = 0
+        while True:
+            bloco = self.consultar(
+                f"SELECT * FROM {TABELA} WHERE id > ? ORDER BY id LIMIT ?",
+                (ultimo_id, linhas_por_bloco)
+            )
+            if bloco.empty:
+                return
+            ultimo_id = int(bloco['id'].iloc[-1])
+            yield bloco.drop(columns=['id', TITULO_NORMALIZADO])
+
+    def agregar(self, dimensoes: List[str]) -> Tuple[Dict[str, Any], pd.DataFrame]:
+        """
+        Calcula totais e o cubo de agregados com consultas de agrupamento.
+        Os valores são somados como inteiros em centavos.
+
+        Args:
+            dimensoes: Colunas do cubo (ex.: Mes_Ano, Categoria, Tipo)
+
+        Returns:
+            Totais gerais e o cubo indexado pelas dimensões
+        """
+        grupo = ", ".join(f'"{d}"' for d in dimensoes)
+        with self._conectar() as conexao:
+            num, entradas, saidas, maior_gasto, maior_entrada, inicio, fim = conexao.execute(
+                f'SELECT COUNT(*), COALESCE(SUM({_CENTAVOS_ENTRADA}), 0), COALESCE(SUM({_CENTAVOS_SAIDA}), 0), '
+                f'COALESCE(MAX({_CENTAVOS_SAIDA}), 0), COALESCE(MAX({_CENTAVOS_ENTRADA}), 0), '
+                f'MIN(Data), MAX(Data) FROM {TABELA}'
+            ).fetchone()
+            # Saldo real = saldo da última transação (na ordem do arquivo) da data mais recente
+            saldo = conexao.execute(
+                f'SELECT {_centavos("Saldo")} FROM {TABELA} WHERE Data = (SELECT MAX(Data) FROM {TABELA}) '
+                f'ORDER BY id DESC LIMIT 1'
+            ).fetchone()
+            cubo = pd.read_sql_query(
+                f'SELECT {grupo}, SUM({_CENTAVOS_ENTRADA}) AS Entrada, SUM({_CENTAVOS_SAIDA}) AS Saida, '
+                f'COUNT(*) AS Num, MAX({_CENTAVOS_ENTRADA}) AS Maior_Entrada, '
+                f'MAX({_CENTAVOS_SAIDA}) AS Maior_Saida FROM {TABELA} GROUP BY {grupo}',
+                conexao
+            )
+
+        totais = {
+            'num_transacoes': int(num),
+            'total_entradas_centavos': int(entradas),
+            'total_saidas_centavos': int(saidas),
+            'maior_gasto_centavos': int(maior_gasto),
+            'maior_entrada_centavos': int(maior_entrada),
+            'data_inicio': pd.Timestamp(inicio) if inicio else None,
+            'data_fim': pd.Timestamp(fim) if fim else None,
+            'saldo_final_centavos': int(saldo[0]) if saldo else 0,
+        }
+        return totais, cubo.set_index(dimensoes).sort_index().astype('int64')
+
+    def maiores(self, coluna: str, limite: int) -> pd.DataFrame:
+        """Maiores transações pela coluna (Entrada ou Saida), usando o índice da coluna."""
+        if coluna not in ('Entrada', 'Saida'):
+            raise ValueError(f"Coluna inválida: {coluna}")
+        return self.consultar(
+            f'SELECT Data, Titulo, Descricao, "{coluna}", Categoria FROM {TABELA} '
+            f'WHERE "{coluna}" > 0 ORDER BY "{coluna}" DESC, id LIMIT ?',
+            (limite,)
+        )
+
+    def gastos_por_titulo(self, limite: int, categoria: Optional[str] = None) -> pd.DataFrame:
+        """
+        Soma (em centavos) e contagem dos gastos por título normalizado, dos
+        maiores para os menores. Cada grupo é rotulado pelo menor título original.
+        """
+        filtro, parametros = ("AND Categoria = ?", (categoria,)) if categoria else ("", ())
+        return self.consultar(
+            f'SELECT MIN(Titulo) AS Titulo, SUM({_CENTAVOS_SAIDA}) AS total, COUNT(*) AS num FROM {TABELA} '
+            f'WHERE Saida > 0 {filtro} GROUP BY "{TITULO_NORMALIZADO}" '
+            f'ORDER BY total DESC, "{TITULO_NORMALIZADO}" LIMIT ?',
+            parametros + (limite,)
+        )
+
+    def resumo_categoria(self, categoria: str) -> Dict[str, Any]:
+        """Total de saídas (em centavos) e número de transações de uma categoria."""
+        with self._conectar() as conexao:
+            total, num = conexao.execute(
+                f'SELECT COALESCE(SUM({_CENTAVOS_SAIDA}), 0), COUNT(*) FROM {TABELA} WHERE Categoria = ?',
+                (categoria,)
+            ).fetchone()
+        return {'total': int(total), 'num': int(num)}
@@ -0,0 +1,94 @@
+"""
+Infrastructure Layer - Cache em disco dos extratos já processados.
+Evita reprocessar e recategorizar o CSV a cada inicialização do processo.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from domain.categorizer import CategorizadorTransacao
+
+
+def hash_arquivo(caminho: Path) -> str:
+    """Hash SHA-256 (truncado) e tamanho do arquivo, no formato '<hash>-<bytes>'."""
+    digest = hashlib.sha256()
+    tamanho = 0
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(bloco)
+            tamanho += len(bloco)
+    return f"{digest.hexdigest()[:32]}-{tamanho}"
+
+
+class CacheExtrato:
+    """
+    Cache do DataFrame de análise em formato Parquet.
+
+    A chave combina o hash e o tamanho do CSV com a versão das regras de
+    categorização, de modo que uma mudança no arquivo ou nos padrões
+    invalida a entrada automaticamente.
+    """
+
+    # Incrementar quando o layout do DataFrame de análise mudar
+    VERSAO_FORMATO = 2
+
+    # Número máximo de extratos mantidos no diretório
+    MAX_ENTRADAS = 8
+
+    def __init__(self, diretorio: str):
+        """
+        Inicializa o cache.
+
+        Args:
+            diretorio: Diretório onde os arquivos Parquet são guardados
+        """
+        self.diretorio = Path(diretorio)
+
+    def chave(self, caminho_csv: Path) -> str:
+        """Calcula a chave do cache para o arquivo CSV informado."""
+        return (
+            f"{hash_arquivo(caminho_csv)}-"
+            f"{CategorizadorTransacao.VERSAO_REGRAS}-v{self.VERSAO_FORMATO}"
+        )
+
+    def _arquivo(self, chave: str) -> Path:
+        return self.diretorio / f"{chave}.parquet"
+
+    def carregar(self, chave: str) -> Optional[pd.DataFrame]:
+        """Retorna o DataFrame em cache ou None se não houver entrada válida."""
+        arquivo = self._arquivo(chave)
+        if not arquivo.exists():
+            return None
+        try:
+            return pd.read_parquet(arquivo)
+        except (ImportError, OSError, ValueError):
+            # Sem engine Parquet instalada ou arquivo corrompido: trata como miss
+            return None
+
+    def salvar(self, chave: str, df: pd.DataFrame) -> None:
+        """Grava o DataFrame no cache de forma atômica."""
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        arquivo = self._arquivo(chave)
+        temporario = arquivo.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            df.to_parquet(temporario, index=False)
+        except ImportError:
+            # Sem engine Parquet instalada: o cache fica desabilitado
+            return
+        os.replace(temporario, arquivo)
+        self._podar()
+
+    def _podar(self) -> None:
+        """Remove as entradas mais antigas além de MAX_ENTRADAS."""
+        arquivos = sorted(
+            self.diretorio.glob('*.parquet'),
+            key=lambda arquivo: arquivo.stat().st_mtime,
+            reverse=True
+        )
+        for antigo in arquivos[self.MAX_ENTRADAS:]:
+            antigo.unlink(missing_ok=True)
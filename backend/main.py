@@ -9,31 +9,82 @@ Arquitetura DDD:
 - API: Endpoints FastAPI (este arquivo)
 """
 
+import asyncio
+import glob
 import os
 import sys
+import time
+from contextlib import asynccontextmanager, nullcontext
 from pathlib import Path
 
 # Adiciona o diretório backend ao path para imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+import threading
 import pandas as pd
-from typing import Optional
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain_experimental.agents import create_pandas_dataframe_agent
+from langchain_experimental.tools.python.tool import PythonAstREPLTool
 import json
 
+from infrastructure.agent_pool import PoolAgentes
+from infrastructure.agent_stream import transmitir_eventos
 from infrastructure.csv_reader import C6BankCSVReader
+from infrastructure.file_watcher import ObservadorArquivos
+from infrastructure.llm_scheduler import AgendadorLLM, FilaCheia
+from infrastructure.multi_csv_reader import C6BankMultiCSVReader
+from infrastructure.pandas_sandbox import ExecutorPandasIsolado, executor_da_sessao
+from infrastructure.shared_dataset import ConjuntoCompartilhado
+from infrastructure.sqlite_store import ArmazemSQLite
+from infrastructure.statement_cache import CacheExtrato
 from application.financial_service import FinancialAnalysisService
+from application.answer_cache import CacheRespostas
+from application.conversation_memory import MemoriaConversas
+from application.intent_router import RoteadorIntencoes
+from application.stats_pack import gerar_pacote_estatisticas
+from domain.categorizer import CategorizadorTransacao
+from domain.categorization_cache import CacheCategorizacao
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
-app = FastAPI(title="CFO Agent API - Finanças Pessoais")
+# Cache de categorização persistido em disco (opcional) para iniciar "aquecido"
+CATEGORIZACAO_CACHE_PATH = os.getenv("CATEGORIZACAO_CACHE_PATH")
+if CATEGORIZACAO_CACHE_PATH:
+    CategorizadorTransacao.configurar_cache(
+        CacheCategorizacao(caminho=CATEGORIZACAO_CACHE_PATH)
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Aquece o serviço financeiro em segundo plano assim que o servidor sobe
+    e passa a observar o extrato para recarregá-lo quando for substituído.
+    """
+    warmup_task = asyncio.create_task(asyncio.to_thread(warmup_financial_service))
+    watcher = None
+    if EXTRATO_WATCH_INTERVAL > 0:
+        watcher = ObservadorArquivos(list_statement_files, reload_financial_service, EXTRATO_WATCH_INTERVAL)
+        watcher.iniciar()
+    yield
+    warmup_task.cancel()
+    if watcher is not None:
+        watcher.encerrar()
+    if _pandas_sandbox is not None:
+        _pandas_sandbox.encerrar()
+    if _financial_service is not None:
+        _financial_service.encerrar()
+
+
+app = FastAPI(title="CFO Agent API - Finanças Pessoais", lifespan=lifespan)
 
 # CORS para permitir requisições do frontend
 app.add_middleware(
@@ -47,6 +98,7 @@ app.add_middleware(
 
 class ChatRequest(BaseModel):
     message: str
+    session_id: Optional[str] = None
 
 
 class BalanceResponse(BaseModel):
@@ -57,34 +109,129 @@ class BalanceResponse(BaseModel):
     num_transacoes: int
 
 
-# Caminho do CSV do C6 Bank
-CSV_PATH = "transacoesC6.csv"
+# Caminho do CSV do C6 Bank (ou diretório/glob com vários extratos mensais)
+CSV_PATH = os.getenv("EXTRATO_PATH", "transacoesC6.csv")
+
+# Diretório do cache Parquet do extrato processado (opcional)
+EXTRATO_CACHE_DIR = os.getenv("EXTRATO_CACHE_DIR")
+
+# Ingestão em stream para extratos muito grandes: máximo de linhas em memória por bloco
+EXTRATO_LINHAS_POR_BLOCO = int(os.getenv("EXTRATO_LINHAS_POR_BLOCO", "0")) or None
+
+# Banco SQLite indexado com as transações (opcional); reutilizado entre reinícios
+EXTRATO_DB_PATH = os.getenv("EXTRATO_DB_PATH")
+
+# Diretório onde o DataFrame de análise é publicado em Arrow e mapeado por todos os workers
+EXTRATO_SHARED_DIR = os.getenv("EXTRATO_SHARED_DIR")
+
+# Intervalo (s) da verificação de mudanças no extrato para recarga automática (0 desliga)
+EXTRATO_WATCH_INTERVAL = float(os.getenv("EXTRATO_WATCH_INTERVAL", "5"))
 
 # Cache para o serviço financeiro
 _financial_service: Optional[FinancialAnalysisService] = None
-_df_cache: Optional[pd.DataFrame] = None
+# Garante que só uma thread carrega o extrato; as demais esperam pelo resultado
+_financial_service_lock = threading.Lock()
+
+# Estado do aquecimento na inicialização, reportado por /ready
+_warmup_state: Dict[str, Any] = {"status": "pendente", "erro": None, "duracao_s": None}
+
+# Recargas feitas depois que o extrato mudou, também reportadas por /ready
+_reload_state: Dict[str, Any] = {"recargas": 0, "ultima_s": None, "erro": None}
+
+
+def build_financial_service() -> FinancialAnalysisService:
+    """Cria um serviço financeiro sobre os extratos atuais, já aquecido."""
+    if not (os.path.exists(CSV_PATH) or glob.glob(CSV_PATH)):
+        raise FileNotFoundError(
+            f"Arquivo {CSV_PATH} não encontrado. "
+            "Faça upload do seu extrato C6 Bank."
+        )
+    cache = CacheExtrato(EXTRATO_CACHE_DIR) if EXTRATO_CACHE_DIR else None
+    banco = ArmazemSQLite(EXTRATO_DB_PATH) if EXTRATO_DB_PATH else None
+    conjunto = ConjuntoCompartilhado(EXTRATO_SHARED_DIR) if EXTRATO_SHARED_DIR else None
+    service = FinancialAnalysisService(
+        CSV_PATH, cache=cache, linhas_por_bloco=EXTRATO_LINHAS_POR_BLOCO,
+        banco=banco, conjunto=conjunto
+    )
+    service.aquecer()
+    return service
 
 
 def get_financial_service() -> FinancialAnalysisService:
-    """Retorna instância do serviço financeiro (singleton)."""
+    """Retorna instância do serviço financeiro (singleton), já aquecida."""
     global _financial_service
-    if _financial_service is None:
-        if not os.path.exists(CSV_PATH):
-            raise FileNotFoundError(
-                f"Arquivo {CSV_PATH} não encontrado. "
-                "Faça upload do seu extrato C6 Bank."
-            )
-        _financial_service = FinancialAnalysisService(CSV_PATH)
+    if _financial_service is not None:
+        return _financial_service
+    
+    with _financial_service_lock:
+        if _financial_service is None:
+            # Publica o serviço só depois de carregado, para nenhuma outra
+            # thread disparar a leitura do extrato em paralelo
+            _financial_service = build_financial_service()
     return _financial_service
 
 
-def get_dataframe() -> pd.DataFrame:
-    """Retorna DataFrame para análise (com cache)."""
-    global _df_cache
-    if _df_cache is None:
+def list_statement_files() -> list[Path]:
+    """Arquivos de extrato observados para a recarga automática."""
+    if C6BankMultiCSVReader.eh_multiplo(CSV_PATH):
+        return C6BankMultiCSVReader(CSV_PATH).listar_arquivos()
+    return [Path(CSV_PATH)]
+
+
+def reload_financial_service() -> None:
+    """
+    Recarrega os dados depois que o extrato mudou, sem interromper a API.
+    
+    O novo serviço (agregados e processos do agente) é montado em segundo
+    plano enquanto as requisições continuam no anterior; a troca é uma única
+    atribuição. O pacote de estatísticas do prompt só é gerado quando o agente
+    for usado, pois no modo stream ele exige o df completo. Requisições em
+    andamento terminam com a instância que já obtiveram. Se a recarga falhar,
+    os dados antigos continuam.
+    """
+    inicio = time.perf_counter()
+    try:
+        service = build_financial_service()
+        sandbox = build_pandas_sandbox(service) if _pandas_sandbox is not None else None
+    except Exception as e:
+        _reload_state["erro"] = str(e)
+        print(f"[RELOAD] Falha ao recarregar o extrato, mantendo os dados anteriores: {e}")
+        return
+    
+    swap_financial_service(service, sandbox)
+    duracao = round(time.perf_counter() - inicio, 3)
+    _reload_state.update(recargas=_reload_state["recargas"] + 1, ultima_s=duracao, erro=None)
+    if _warmup_state["status"] == "erro":
+        _warmup_state.update(status="pronto", erro=None)
+    print(f"[RELOAD] Extrato recarregado em {duracao:.2f}s (versão {service.versao_dados})")
+
+
+def warmup_financial_service() -> None:
+    """Carrega o extrato e os agregados antes da primeira requisição."""
+    _warmup_state["status"] = "aquecendo"
+    inicio = time.perf_counter()
+    try:
         service = get_financial_service()
-        _df_cache = service.df
-    return _df_cache
+        # Pré-inicia os processos que executam o código do agente. No modo
+        # stream ou com banco o df só é lido na primeira pergunta ao agente
+        if os.getenv("GROQ_API_KEY") and not service.df_sob_demanda:
+            get_pandas_sandbox()
+    except Exception as e:
+        _warmup_state.update(status="erro", erro=str(e))
+        print(f"[WARMUP] Falha ao carregar o extrato: {e}")
+    else:
+        _warmup_state["status"] = "pronto"
+        print(f"[WARMUP] Extrato carregado em {time.perf_counter() - inicio:.2f}s")
+    finally:
+        _warmup_state["duracao_s"] = round(time.perf_counter() - inicio, 3)
+
+
+def get_dataframe() -> pd.DataFrame:
+    """
+    Retorna DataFrame para análise (com cache no serviço).
+    Sempre consultado no serviço para refletir extratos adicionados depois da carga.
+    """
+    return get_financial_service().df
 
 
 # System Prompt do CFO Pessoal - será formatado dinamicamente com info do DataFrame
@@ -103,6 +250,11 @@ Resumo dos dados:
 - Total de Saídas: R$ {total_saidas:,.2f}
 - Saldo do Período: R$ {saldo:,.2f}
 
+## ESTATÍSTICAS PRÉ-CALCULADAS
+Valores em R$, já calculados sobre todo o `df`. Quando a resposta estiver aqui, use estes números diretamente, sem executar código; use o `df` apenas para detalhes que não aparecem abaixo.
+
+{estatisticas}
+
 Colunas disponíveis no `df`:
 - Data: Data da transação (datetime)
 - Titulo: Título/descrição principal da transação
@@ -143,20 +295,64 @@ def root():
     return {"message": "CFO Agent API - Finanças Pessoais está rodando"}
 
 
+@app.get("/ready")
+def ready():
+    """Readiness: só responde 200 depois que o extrato foi carregado."""
+    if _financial_service is None:
+        return JSONResponse(status_code=503, content=_warmup_state)
+    return {**_warmup_state, "status": "pronto", "recarga": _reload_state}
+
+
+# Cache de respostas por endpoint: (versão dos dados, ETag, corpo JSON serializado)
+_response_cache: Dict[str, Tuple[str, str, bytes]] = {}
+_response_cache_lock = threading.Lock()
+
+
+def versioned_response(request: Request, endpoint: str,
+                       build: Callable[[FinancialAnalysisService], Any]) -> Response:
+    """
+    Responde a partir do cache enquanto a versão dos dados não mudar.
+    
+    O ETag é derivado da versão dos dados; se o cliente já tem essa versão
+    (If-None-Match), devolve 304 sem recalcular nem serializar nada. O
+    serviço é obtido uma única vez e passado para build(), para que o corpo
+    e o ETag venham da mesma versão mesmo durante uma recarga.
+    """
+    service = get_financial_service()
+    versao = service.versao_dados
+    etag = f'"{endpoint}-{versao}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    etags_cliente = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in etags_cliente or "*" in etags_cliente:
+        return Response(status_code=304, headers=headers)
+    
+    cached = _response_cache.get(endpoint)
+    if cached is None or cached[0] != versao:
+        body = json.dumps(jsonable_encoder(build(service)), ensure_ascii=False).encode("utf-8")
+        cached = (versao, etag, body)
+        with _response_cache_lock:
+            _response_cache[endpoint] = cached
+    
+    return Response(content=cached[2], media_type="application/json", headers=headers)
+
+
 @app.get("/balance", response_model=BalanceResponse)
-def get_balance_endpoint():
+def get_balance_endpoint(request: Request):
     """Endpoint para obter o resumo financeiro."""
     try:
-        service = get_financial_service()
-        resumo = service.obter_resumo_geral()
+        def build(service: FinancialAnalysisService):
+            resumo = service.obter_resumo_geral()
+            return BalanceResponse(
+                saldo_total=resumo.saldo_periodo,
+                total_receitas=resumo.total_entradas,
+                total_despesas=resumo.total_saidas,
+                taxa_poupanca=resumo.taxa_poupanca,
+                num_transacoes=resumo.num_transacoes
+            )
         
-        return BalanceResponse(
-            saldo_total=resumo.saldo_periodo,
-            total_receitas=resumo.total_entradas,
-            total_despesas=resumo.total_saidas,
-            taxa_poupanca=resumo.taxa_poupanca,
-            num_transacoes=resumo.num_transacoes
-        )
+        return versioned_response(request, "balance", build)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -164,19 +360,21 @@ def get_balance_endpoint():
 
 
 @app.get("/insights")
-def get_insights():
+def get_insights(request: Request):
     """Endpoint para obter insights automáticos."""
     try:
-        service = get_financial_service()
-        insights = service.gerar_insights()
-        gastos_categoria = service.obter_gastos_por_categoria()
-        alimentacao = service.obter_gastos_alimentacao_fora()
+        def build(service: FinancialAnalysisService):
+            insights = service.gerar_insights()
+            gastos_categoria = service.obter_gastos_por_categoria()
+            alimentacao = service.obter_gastos_alimentacao_fora()
+            
+            return {
+                "insights": insights,
+                "gastos_por_categoria": gastos_categoria,
+                "analise_alimentacao": alimentacao
+            }
         
-        return {
-            "insights": insights,
-            "gastos_por_categoria": gastos_categoria,
-            "analise_alimentacao": alimentacao
-        }
+        return versioned_response(request, "insights", build)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -184,35 +382,242 @@ def get_insights():
 
 
 @app.get("/resumo-mensal")
-def get_resumo_mensal():
+def get_resumo_mensal(request: Request):
     """Endpoint para obter resumo mês a mês."""
     try:
-        service = get_financial_service()
-        resumos = service.obter_resumo_por_mes()
+        def build(service: FinancialAnalysisService):
+            resumos = service.obter_resumo_por_mes()
+            
+            return {
+                "resumos": [
+                    {
+                        "mes_ano": r.mes_ano,
+                        "total_entradas": r.total_entradas,
+                        "total_saidas": r.total_saidas,
+                        "saldo": r.saldo,
+                        "taxa_poupanca": r.taxa_poupanca,
+                        "gastos_por_categoria": r.gastos_por_categoria
+                    }
+                    for r in resumos
+                ]
+            }
         
-        return {
-            "resumos": [
-                {
-                    "mes_ano": r.mes_ano,
-                    "total_entradas": r.total_entradas,
-                    "total_saidas": r.total_saidas,
-                    "saldo": r.saldo,
-                    "taxa_poupanca": r.taxa_poupanca,
-                    "gastos_por_categoria": r.gastos_por_categoria
-                }
-                for r in resumos
-            ]
-        }
+        return versioned_response(request, "resumo-mensal", build)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro: {str(e)}")
 
 
+# Modelo usado pelo agente CFO
+CHAT_MODEL = "llama-3.3-70b-versatile"
+
+# Agentes ociosos mantidos para reuso entre mensagens do chat
+AGENT_POOL_SIZE = int(os.getenv("AGENT_POOL_SIZE", "4"))
+
+# Cliente do LLM compartilhado (mantém conexões HTTP keep-alive com a Groq)
+_llm: Optional[ChatGroq] = None
+_agent_pool = PoolAgentes(AGENT_POOL_SIZE)
+
+# Limite de execuções simultâneas do agente e da fila de espera (429 quando cheia)
+_llm_scheduler = AgendadorLLM(
+    max_concorrencia=int(os.getenv("CHAT_MAX_CONCORRENCIA", "4")),
+    max_fila=int(os.getenv("CHAT_MAX_FILA", "16")),
+)
+
+# Execução isolada do código pandas do agente (0 workers executa no próprio processo)
+PANDAS_SANDBOX_WORKERS = int(os.getenv("PANDAS_SANDBOX_WORKERS", "2"))
+PANDAS_SANDBOX_TIMEOUT = float(os.getenv("PANDAS_SANDBOX_TIMEOUT", "20"))
+PANDAS_SANDBOX_MEMORIA_MB = int(os.getenv("PANDAS_SANDBOX_MEMORIA_MB", "2048"))
+_pandas_sandbox: Optional[ExecutorPandasIsolado] = None
+_pandas_sandbox_version: Optional[str] = None
+_pandas_sandbox_lock = threading.Lock()
+
+# Orçamento (aproximado, em tokens) das estatísticas pré-calculadas no prompt
+PROMPT_STATS_TOKENS = int(os.getenv("PROMPT_STATS_TOKENS", "1500"))
+_stats_pack: Optional[Tuple[str, str]] = None
+
+# Memória das conversas por sessão: turnos recentes + resumo dos antigos
+_chat_memory = MemoriaConversas(
+    max_sessoes=int(os.getenv("CHAT_MAX_SESSOES", "500")),
+    turnos_recentes=int(os.getenv("CHAT_TURNOS_RECENTES", "3")),
+    orcamento_tokens=int(os.getenv("CHAT_MEMORIA_TOKENS", "1200")),
+)
+
+# Cache de respostas do agente, invalidado quando a versão dos dados muda
+_answer_cache = CacheRespostas(
+    capacidade=int(os.getenv("CHAT_CACHE_SIZE", "1000")),
+    ttl_segundos=float(os.getenv("CHAT_CACHE_TTL", "3600")),
+    limiar_similaridade=float(os.getenv("CHAT_CACHE_SIMILARIDADE", "0")) or None,
+)
+
+
+def get_llm(groq_api_key: str) -> ChatGroq:
+    """Retorna o cliente do LLM, criado uma única vez."""
+    global _llm
+    if _llm is None:
+        _llm = ChatGroq(
+            model_name=CHAT_MODEL,  # Modelo mais capaz para análise
+            groq_api_key=groq_api_key,
+            temperature=0.3,
+        )
+    return _llm
+
+
+def get_stats_pack(service: FinancialAnalysisService) -> str:
+    """Pacote de estatísticas do prompt, gerado uma vez por versão dos dados."""
+    global _stats_pack
+    versao = service.versao_dados
+    if _stats_pack is None or _stats_pack[0] != versao:
+        _stats_pack = (versao, gerar_pacote_estatisticas(service, PROMPT_STATS_TOKENS))
+    return _stats_pack[1]
+
+
+def build_system_prompt(service: FinancialAnalysisService) -> str:
+    """Gera o prompt do agente com as informações reais do extrato."""
+    resumo = service.obter_resumo_geral()
+    agregados = service.agregados
+    
+    # Obter datas com tratamento de NaT
+    data_inicio_str = agregados.data_inicio.strftime('%d/%m/%Y') if pd.notna(agregados.data_inicio) else 'N/A'
+    data_fim_str = agregados.data_fim.strftime('%d/%m/%Y') if pd.notna(agregados.data_fim) else 'N/A'
+    
+    return SYSTEM_PROMPT_TEMPLATE.format(
+        num_transacoes=resumo.num_transacoes,
+        data_inicio=data_inicio_str,
+        data_fim=data_fim_str,
+        total_entradas=resumo.total_entradas,
+        total_saidas=resumo.total_saidas,
+        saldo=resumo.saldo_periodo,
+        estatisticas=get_stats_pack(service),
+    )
+
+
+class SandboxedPythonTool(PythonAstREPLTool):
+    """Ferramenta Python do agente executada nos processos isolados."""
+    
+    def _run(self, query: str, run_manager=None) -> str:
+        # Uma pergunta em andamento continua no pool (e nos dados) em que começou,
+        # mesmo que o extrato seja recarregado no meio da resposta
+        executor = executor_da_sessao() or get_pandas_sandbox()
+        return executor.executar(query)
+
+
+def get_pandas_sandbox() -> Optional[ExecutorPandasIsolado]:
+    """
+    Retorna o pool de execução isolada para a versão atual dos dados,
+    recriando-o quando os dados mudam. None se a execução isolada estiver desligada.
+    """
+    global _pandas_sandbox, _pandas_sandbox_version
+    if PANDAS_SANDBOX_WORKERS <= 0:
+        return None
+    
+    with _pandas_sandbox_lock:
+        # Lido sob o lock: a recarga troca serviço e pool juntos
+        service = get_financial_service()
+        if _pandas_sandbox is None or _pandas_sandbox_version != service.versao_dados:
+            previous = _pandas_sandbox
+            _pandas_sandbox = build_pandas_sandbox(service)
+            _pandas_sandbox_version = service.versao_dados
+            if previous is not None:
+                previous.encerrar()
+    return _pandas_sandbox
+
+
+def build_pandas_sandbox(service: FinancialAnalysisService) -> ExecutorPandasIsolado:
+    """Inicia um pool de execução isolada sobre o df do serviço."""
+    return ExecutorPandasIsolado(
+        service.df,
+        num_workers=PANDAS_SANDBOX_WORKERS,
+        timeout_s=PANDAS_SANDBOX_TIMEOUT,
+        memoria_mb=PANDAS_SANDBOX_MEMORIA_MB,
+        # Com o conjunto compartilhado, os workers mapeiam o mesmo arquivo
+        arquivo_arrow=service.arquivo_compartilhado,
+    )
+
+
+def swap_financial_service(service: FinancialAnalysisService,
+                           sandbox: Optional[ExecutorPandasIsolado]) -> None:
+    """Troca o serviço (e o pool de execução já iniciado para ele) de uma vez."""
+    global _financial_service, _pandas_sandbox, _pandas_sandbox_version
+    with _pandas_sandbox_lock:
+        previous = _pandas_sandbox if sandbox is not None else None
+        if sandbox is not None:
+            _pandas_sandbox = sandbox
+            _pandas_sandbox_version = service.versao_dados
+        with _financial_service_lock:
+            previous_service = _financial_service
+            _financial_service = service
+    # Workers ocupados do pool antigo só são encerrados quando a pergunta termina
+    if previous is not None:
+        previous.encerrar()
+    # Apaga o armazém temporário do modo stream do serviço anterior
+    if previous_service is not None:
+        previous_service.encerrar()
+
+
+def build_agent(groq_api_key: str, service: FinancialAnalysisService):
+    """Cria um agente CFO sobre o DataFrame do serviço informado."""
+    agent = create_pandas_dataframe_agent(
+        llm=get_llm(groq_api_key),
+        df=service.df,
+        verbose=False,
+        agent_type="tool-calling",
+        allow_dangerous_code=True,
+        prefix=build_system_prompt(service),
+        number_of_head_rows=0,  # Não mostrar preview do df
+    )
+    
+    # O código gerado pelo LLM roda fora do processo da API, com limite de tempo
+    if PANDAS_SANDBOX_WORKERS > 0:
+        agent.tools = [SandboxedPythonTool()]
+    return agent
+
+
+def sse_event(payload: Dict[str, Any]) -> str:
+    """Formata um frame Server-Sent Events."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def stream_text(text: str):
+    """Envia uma resposta pronta no mesmo formato SSE do agente."""
+    yield sse_event({'content': text})
+    yield "data: [DONE]\n\n"
+
+
+def remember_turn(request: ChatRequest, answer: str) -> None:
+    """Registra a pergunta e a resposta na memória da sessão, se houver sessão."""
+    if request.session_id:
+        _chat_memory.registrar(request.session_id, request.message, answer)
+
+
 @app.post("/chat")
 async def chat(request: ChatRequest):
     """Endpoint de chat que retorna streaming de respostas do agente CFO."""
     try:
+        # Enquanto o extrato carrega, o chat não bloqueia esperando pela carga
+        if _financial_service is None:
+            raise HTTPException(
+                status_code=503,
+                detail=_warmup_state["erro"] or "O extrato ainda está sendo carregado. Tente novamente em instantes.",
+                headers={"Retry-After": "5"},
+            )
+        
+        # Perguntas frequentes são respondidas direto pelo serviço, sem o LLM;
+        # as chamadas síncronas rodam em threads para não travar o event loop
+        service = await asyncio.to_thread(get_financial_service)
+        answer = await asyncio.to_thread(RoteadorIntencoes(service).responder, request.message)
+        if answer is not None:
+            remember_turn(request, answer)
+            return StreamingResponse(
+                stream_text(answer),
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                },
+            )
+        
         # Verificar se a API key do Groq está configurada
         groq_api_key = os.getenv("GROQ_API_KEY")
         if not groq_api_key:
@@ -221,86 +626,68 @@ async def chat(request: ChatRequest):
                 detail="GROQ_API_KEY não configurada. Configure no arquivo .env",
             )
         
-        # Carregar transações e serviço
-        df = get_dataframe()
-        service = get_financial_service()
-        resumo = service.obter_resumo_geral()
-        
-        # Debug: mostrar info do DataFrame
-        print(f"[DEBUG] DataFrame shape: {df.shape}")
-        print(f"[DEBUG] Colunas: {df.columns.tolist()}")
-        print(f"[DEBUG] Data min: {df['Data'].min()}, Data max: {df['Data'].max()}")
-        
-        # Obter datas com tratamento de NaT
-        data_min = df['Data'].min()
-        data_max = df['Data'].max()
-        data_inicio_str = data_min.strftime('%d/%m/%Y') if pd.notna(data_min) else 'N/A'
-        data_fim_str = data_max.strftime('%d/%m/%Y') if pd.notna(data_max) else 'N/A'
+        # Com histórico, a pergunta pode depender das anteriores ("e em fevereiro?"):
+        # vai para o agente junto com o contexto e não usa o cache de respostas
+        versao = service.versao_dados
+        context = _chat_memory.contexto(request.session_id)
+        agent_input = f"{context}\n\nPergunta atual: {request.message}" if context else request.message
         
-        print(f"[DEBUG] Data inicio: {data_inicio_str}, Data fim: {data_fim_str}")
-        
-        # Gerar o prompt dinamicamente com informações reais do DataFrame
-        system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
-            num_transacoes=len(df),
-            data_inicio=data_inicio_str,
-            data_fim=data_fim_str,
-            total_entradas=resumo.total_entradas,
-            total_saidas=resumo.total_saidas,
-            saldo=resumo.saldo_periodo
-        )
-        
-        print(f"[DEBUG] System prompt gerado com sucesso")
-        
-        # Configurar o LLM
-        llm = ChatGroq(
-            model_name="llama-3.3-70b-versatile",  # Modelo mais capaz para análise
-            groq_api_key=groq_api_key,
-            temperature=0.3,
-        )
-        
-        # Criar agente com Pandas DataFrame
-        agent = create_pandas_dataframe_agent(
-            llm=llm,
-            df=df,
-            verbose=True,
-            agent_type="tool-calling",
-            allow_dangerous_code=True,
-            prefix=system_prompt,
-            number_of_head_rows=0,  # Não mostrar preview do df
-        )
+        # Perguntas repetidas com os mesmos dados reaproveitam a resposta anterior
+        cached_answer = None if context else _answer_cache.obter(request.message, versao)
+        if cached_answer is not None:
+            remember_turn(request, cached_answer)
+            return StreamingResponse(
+                stream_text(cached_answer),
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                },
+            )
         
-        # Criar função de streaming
-        async def generate_response():
+        # Execução do agente, compartilhada por perguntas idênticas simultâneas
+        async def run_agent():
             try:
-                print(f"[DEBUG] Processando mensagem: {request.message}")
+                # Só respostas completas entram no cache; falhas não se repetem para outros usuários
+                def store_answer(answer: str) -> None:
+                    _answer_cache.guardar(request.message, versao, answer)
                 
-                # Executar o agente
-                result = await agent.ainvoke({"input": request.message})
-                
-                print(f"[DEBUG] Resultado do agente: {result}")
-                
-                # Retornar a resposta em chunks para simular streaming
-                response_text = result.get("output", "Desculpe, não consegui processar sua solicitação.")
-                
-                if not response_text or len(response_text.strip()) == 0:
-                    response_text = "Desculpe, não recebi uma resposta válida do agente."
-                
-                print(f"[DEBUG] Resposta final: {response_text[:100]}...")
-                
-                # Dividir em chunks menores para streaming
-                chunk_size = 20
-                for i in range(0, len(response_text), chunk_size):
-                    chunk = response_text[i : i + chunk_size]
-                    yield f"data: {json.dumps({'content': chunk})}\n\n"
-                
-                yield "data: [DONE]\n\n"
+                sandbox = await asyncio.to_thread(get_pandas_sandbox)
+                # Os agentes são reconstruídos só quando os dados mudam
+                async with _agent_pool.emprestar(versao, lambda: build_agent(groq_api_key, service)) as agent:
+                    # Todos os passos da pergunta usam o mesmo processo isolado
+                    with sandbox.sessao() if sandbox else nullcontext():
+                        async for payload in transmitir_eventos(agent, agent_input, None if context else store_answer):
+                            yield payload
             except Exception as e:
                 import traceback
                 error_msg = f"Erro ao processar: {str(e)}"
                 print(f"[ERROR] {error_msg}")
                 print(f"[ERROR] Traceback: {traceback.format_exc()}")
-                yield f"data: {json.dumps({'error': error_msg})}\n\n"
-                yield "data: [DONE]\n\n"
+                yield {'error': error_msg}
+        
+        try:
+            # Perguntas com contexto só são equivalentes dentro da mesma sessão
+            key = (versao, request.session_id if context else None, CacheRespostas.chave(request.message))
+            events = _llm_scheduler.executar(key, run_agent)
+        except FilaCheia as e:
+            raise HTTPException(
+                status_code=429,
+                detail="Muitas perguntas em andamento. Tente novamente em instantes.",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        
+        # Criar função de streaming
+        async def generate_response():
+            answer_parts = []
+            failed = False
+            async for payload in events:
+                answer_parts.append(payload.get('content', ''))
+                failed = failed or 'error' in payload
+                yield sse_event(payload)
+            if not failed:
+                remember_turn(request, ''.join(answer_parts))
+            yield "data: [DONE]\n\n"
         
         return StreamingResponse(
             generate_response(),
@@ -311,12 +698,37 @@ async def chat(request: ChatRequest):
             },
         )
     
+    except HTTPException:
+        raise
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 
+@app.get("/memoria")
+def get_memoria():
+    """Memória ocupada pelo DataFrame de análise, por coluna."""
+    try:
+        return get_financial_service().obter_uso_memoria()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro: {str(e)}")
+
+
+@app.get("/chat/stats")
+def chat_stats():
+    """Métricas do cache de respostas e do pool de agentes do chat."""
+    return {
+        "cache_respostas": _answer_cache.estatisticas(),
+        "pool_agentes": _agent_pool.estatisticas(),
+        "agendador": _llm_scheduler.estatisticas(),
+        "memoria_conversas": _chat_memory.estatisticas(),
+        "sandbox_pandas": _pandas_sandbox.estatisticas() if _pandas_sandbox else None,
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     
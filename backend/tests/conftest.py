@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from application.financial_service import FinancialAnalysisService  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def service():
+    return FinancialAnalysisService(str(BACKEND / 'transacoesC6_exemplo.csv'))
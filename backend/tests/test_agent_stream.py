@@ -0,0 +1,64 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from application.answer_cache import CacheRespostas
+from infrastructure.agent_stream import RESPOSTA_VAZIA, transmitir_eventos
+from infrastructure.pandas_sandbox import ExecutorPandasIsolado
+
+
+class AgenteFalso:
+    """Reproduz a sequência de eventos de uma execução do agente com uma ferramenta."""
+
+    def __init__(self, saida_ferramenta, resposta):
+        self.saida_ferramenta = saida_ferramenta
+        self.resposta = resposta
+
+    async def astream_events(self, entrada, version):
+        yield {'event': 'on_tool_start', 'data': {}}
+        yield {'event': 'on_tool_end', 'data': {'output': self.saida_ferramenta}}
+        for token in self.resposta.split():
+            yield {'event': 'on_chat_model_stream', 'data': {'chunk': SimpleNamespace(content=token + ' ')}}
+        yield {'event': 'on_chain_end', 'data': {'output': {'output': self.resposta}}}
+
+
+def executar(agente, cache):
+    # Como no /chat: a pergunta passa pelo cache (miss) antes do agente
+    assert cache.obter('quanto gastei?', 'v1') is None
+
+    async def consumir():
+        guardar = lambda resposta: cache.guardar('quanto gastei?', 'v1', resposta)  # noqa: E731
+        return [payload async for payload in transmitir_eventos(agente, 'quanto gastei?', guardar)]
+    return asyncio.run(consumir())
+
+
+def test_resposta_completa_vai_para_o_cache():
+    cache = CacheRespostas()
+    payloads = executar(AgenteFalso('2519.4', 'Você gastou R$ 2.519,40'), cache)
+
+    assert payloads[0] == {'status': 'Executando código pandas...'}
+    assert cache.obter('quanto gastei?', 'v1') == 'Você gastou R$ 2.519,40 '
+
+
+def test_resposta_vazia_nao_vai_para_o_cache():
+    cache = CacheRespostas()
+    payloads = executar(AgenteFalso('2519.4', ''), cache)
+
+    assert payloads[-1] == {'content': RESPOSTA_VAZIA}
+    assert cache.obter('quanto gastei?', 'v1') is None
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='RLIMIT_AS só é aplicado no Linux')
+def test_execucao_com_limite_de_memoria_nao_vai_para_o_cache():
+    executor = ExecutorPandasIsolado(pd.DataFrame({'Saida': [1.0]}), num_workers=1, memoria_mb=1024)
+    try:
+        saida = executor.executar('np.ones(4 * 1024 ** 3 // 8).sum()')
+    finally:
+        executor.encerrar()
+
+    cache = CacheRespostas()
+    executar(AgenteFalso(saida, 'Não consegui calcular, mas seus gastos parecem altos'), cache)
+    assert cache.obter('quanto gastei?', 'v1') is None
@@ -0,0 +1,100 @@
+import re
+
+import pytest
+
+from domain.categorization_cache import CacheCategorizacao
+from domain.categorizer import CategorizadorTransacao
+from domain.entities import CategoriaTransacao, TipoTransacao
+from infrastructure.csv_reader import C6BankCSVReader
+
+from conftest import BACKEND
+
+
+def categorizar_referencia(titulo, descricao, valor_entrada, valor_saida):
+    """Implementação original: um re.search por padrão, na ordem das tabelas."""
+    tipo = TipoTransacao.ENTRADA if valor_entrada > 0 else TipoTransacao.SAIDA
+    texto = f"{titulo} {descricao}".lower()
+
+    def por_padrao():
+        for categoria, padroes in CategorizadorTransacao.PADROES_CATEGORIA.items():
+            for padrao in padroes:
+                if re.search(padrao, texto, re.IGNORECASE):
+                    return categoria
+        return CategoriaTransacao.OUTROS
+
+    def eh_empresa():
+        return any(re.search(p, texto, re.IGNORECASE) for p in CategorizadorTransacao.PADROES_EMPRESAS)
+
+    if tipo == TipoTransacao.ENTRADA and re.search(r'pix\s+recebido', texto):
+        return tipo, CategoriaTransacao.PIX_RECEBIDO
+    if tipo == TipoTransacao.SAIDA and re.search(r'pix\s+enviado|transf\s+enviada\s+pix', texto):
+        if eh_empresa():
+            categoria = por_padrao()
+            return tipo, categoria if categoria != CategoriaTransacao.OUTROS else CategoriaTransacao.PIX_ENVIADO
+        return tipo, CategoriaTransacao.TRANSFERENCIA_PESSOAL
+    return tipo, por_padrao()
+
+
+DESCRICOES = [
+    'IFOOD SAO PAULO BRA', 'UBER EATS SAO PAULO', 'UBER  TRIP HELP.UBER.COM', 'UBER DO BRASIL TECNOLOGIA',
+    '99 POP', '99TAXI', 'PADARIA PAO QUENTE', 'MC DONALDS', 'ARCOS DOURADOS COM', 'POKE HOUSE',
+    'SUPERMERCADO ANGELONI', 'MERCADO LIVRE SAO PAULO BRA', 'MERCADO 24HS', 'ATACADAO', 'ASSAI ATACADISTA',
+    'BIG BOMPRECO', 'EXTRA HIPER', 'POSTO SHELL', 'POSTO IPIRANGA', 'RAIZEN COMBUSTIVEIS', 'REDPARK ESTACIONAMENTO',
+    'QUERO PASSAGEM', 'PANVEL FARMACIAS', 'DROGA RAIA', 'DROGASIL', 'UNIMED', 'CLINICA ODONTO',
+    'ALUGUEL APTO', 'CONDOMINIO', 'CELESC ENERGIA', 'VIVO CELULAR', 'CLARO INTERNET', 'TIM BRASIL',
+    'TARIFA MANUTENCAO CP', 'TAR SAQUE TERMINAL', 'IOF COMPRA INTERNACIONAL', 'JUROS CHEQUE ESPECIAL',
+    'CINEMARK', 'CINEMA MULTIPLEX', 'AIRBNB', 'BOOKING.COM', 'HOTEL URBANO', 'COMEDY CLUB',
+    'RESTAURANTE SABOR CASEIRO', 'BAR DO ZE', 'BARBEARIA DO ZE', 'PUB IRLANDES', 'OUTBACK STEAKHOUSE',
+    'PIZZARIA NAPOLI', 'COCO BAMBU', 'BACIO DI LATTE', 'COFFEE SHOP', 'BISTRÔ CENTRAL',
+    'AMAZON PRIME VIDEO', 'AMAZON MARKETPLACE', 'LOJAS RENNER', 'ZARA BRASIL', 'SHOPEE', 'SEPHORA',
+    'ACADEMIA FITNESS CENTER', 'LAVANDERIA 5ASEC', 'SALÃO DE BELEZA', 'NETFLIX.COM', 'SPOTIFY BRAZIL',
+    'STEAM PURCHASE', 'IP AFINZ', 'SAQUE BANCO 24H', 'TERMINAL TECBAN', 'LIVRARIA CULTURA',
+    'SALARIO EMPRESA ABC', 'PRO-LABORE', 'ESTORNO COMPRA', 'REEMBOLSO DESPESA', 'CREDITO DE DEVOLUCAO',
+    'ÁGUA E ESGOTO', 'GÁS NATURAL', 'CAFÉ DO PONTO', 'AÇAÍ DA PRAIA', '', 'XYZ 123',
+]
+
+PIX_ENVIADOS = [
+    'JOAO DA SILVA', 'MARIA SANTOS', 'IMOBILIARIA XYZ', 'SUPERMERCADO BOM PRECO', 'UBER DO BRASIL TECNOLOGIA LTDA.',
+    'ACADEMIA FITNESS CENTER', 'BARBEARIA DO ZE', 'POSTO SHELL', 'PADARIA DO BAIRRO ME', 'OFICINA EIRELI',
+    'PAGSEGURO INTERNET', 'MERCADO PAGO', 'PICPAY', 'NUBANK', 'TESOURO NACIONAL', 'RESTAURANTE DA VILA',
+    'HOTEL FAZENDA', 'CLINICA SORRIA S.A.', 'ANA COSTA', 'JOSE MEIRELES',
+]
+
+
+def casos():
+    for descricao in DESCRICOES:
+        yield 'DEBITO DE CARTAO ', descricao, 0.0, 10.0
+        yield 'Credito ', descricao, 10.0, 0.0
+    for destino in PIX_ENVIADOS:
+        yield f'Pix enviado para {destino}', 'TRANSF ENVIADA PIX', 0.0, 10.0
+        yield f'Pix recebido de {destino}', f'Pix recebido de {destino}', 10.0, 0.0
+        # Pix "recebido" com valor de saída e "enviado" com valor de entrada
+        yield f'Pix recebido de {destino}', '', 0.0, 10.0
+        yield f'Pix enviado para {destino}', '', 10.0, 0.0
+
+    reader = C6BankCSVReader(str(BACKEND / 'transacoesC6_exemplo.csv'))
+    df = reader.carregar()
+    yield from zip(df['Título'], df['Descrição'], df['Entrada(R$)'], df['Saída(R$)'])
+
+
+@pytest.fixture(autouse=True)
+def cache_vazio(monkeypatch):
+    # Sem o memo, as duas implementações são realmente executadas
+    cache = CacheCategorizacao()
+    cache.garantir_versao(CategorizadorTransacao.VERSAO_REGRAS)
+    monkeypatch.setattr(CategorizadorTransacao, 'cache', cache)
+
+
+def test_categorizar_igual_a_referencia():
+    for titulo, descricao, entrada, saida in casos():
+        esperado = categorizar_referencia(titulo, descricao, entrada, saida)
+        assert CategorizadorTransacao.categorizar(titulo, descricao, entrada, saida) == esperado, (titulo, descricao)
+
+
+def test_categorizar_lote_igual_a_referencia():
+    titulos, descricoes, entradas, saidas = map(list, zip(*casos()))
+    tipos, categorias = CategorizadorTransacao.categorizar_lote(titulos, descricoes, entradas, saidas)
+
+    esperado = [categorizar_referencia(*caso) for caso in zip(titulos, descricoes, entradas, saidas)]
+    assert tipos.tolist() == [tipo.value for tipo, _ in esperado]
+    assert categorias.tolist() == [categoria.value for _, categoria in esperado]
@@ -0,0 +1,64 @@
+import pytest
+
+from application.intent_router import RoteadorIntencoes
+
+
+@pytest.fixture
+def roteador(service):
+    return RoteadorIntencoes(service)
+
+
+class ServicoSemMeses:
+    def obter_meses(self):
+        return []
+
+
+def test_resumo_de_um_mes(roteador):
+    assert roteador.responder('resumo de janeiro').startswith('Resumo de janeiro de 2025:')
+    assert roteador.responder('resumo de 2025-02').startswith('Resumo de fevereiro de 2025:')
+    assert roteador.responder('resumo de 03/2025').startswith('Resumo de março de 2025:')
+
+
+def test_mes_sem_transacoes(roteador):
+    assert roteador.responder('resumo de julho de 2024') == (
+        'Não encontrei transações em julho de 2024 no seu extrato.'
+    )
+
+
+@pytest.mark.parametrize('pergunta', [
+    'de janeiro a março quanto gastei',
+    'resumo de janeiro e fevereiro',
+    'quanto gastei com alimentação em janeiro e fevereiro',
+    'resumo de 2025-01 e 02/2025',
+    'resumo do último mês e de janeiro',
+])
+def test_varios_meses_vao_para_o_agente(roteador, pergunta):
+    assert roteador.responder(pergunta) is None
+
+
+@pytest.mark.parametrize('pergunta', ['resumo de 13/2025', 'resumo de 2025-00', 'quanto gastei em 2025-13'])
+def test_mes_invalido_vai_para_o_agente(roteador, pergunta):
+    assert roteador.responder(pergunta) is None
+
+
+@pytest.mark.parametrize('pergunta', ['resumo de janeiro', 'resumo do último mês'])
+def test_extrato_sem_meses_vai_para_o_agente(pergunta):
+    assert RoteadorIntencoes(ServicoSemMeses()).responder(pergunta) is None
+
+
+@pytest.mark.parametrize('pergunta', [
+    'quanto eu gastei fora de janeiro',
+    'resumo fora de fevereiro',
+    'quanto gastei com alimentação fora de janeiro',
+])
+def test_fora_fora_da_expressao_vai_para_o_agente(roteador, pergunta):
+    assert roteador.responder(pergunta) is None
+
+
+@pytest.mark.parametrize('pergunta', ['quanto gastei para comer fora', 'quanto gastei com alimentação fora'])
+def test_alimentacao_fora(roteador, pergunta):
+    assert roteador.responder(pergunta).startswith('Você gastou R$ 449,30 com alimentação fora de casa')
+
+
+def test_pergunta_aberta_vai_para_o_agente(roteador):
+    assert roteador.responder('como posso reduzir meus gastos com alimentação') is None
@@ -0,0 +1,57 @@
+import sys
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from infrastructure.pandas_sandbox import ExecutorPandasIsolado, execucao_interrompida
+
+
+def test_encerrar_acorda_quem_espera_worker():
+    executor = ExecutorPandasIsolado(pd.DataFrame({'Saida': [1.0, 2.0]}), num_workers=1, memoria_mb=0)
+    respostas = []
+    try:
+        with executor.sessao():
+            assert executor.executar("df['Saida'].sum()") == '3.0'
+
+            # O único worker está ocupado por esta sessão
+            esperando = threading.Thread(target=lambda: respostas.append(executor.executar('1 + 1')))
+            esperando.start()
+            time.sleep(0.2)
+            assert esperando.is_alive()
+
+            executor.encerrar()
+            esperando.join(timeout=2 * ExecutorPandasIsolado.ESPERA_S + 1)
+            assert not esperando.is_alive()
+    finally:
+        executor.encerrar()
+
+    assert respostas[0].startswith('Erro: o ambiente de execução foi encerrado')
+    assert executor.executar('1 + 1').startswith('Erro: o ambiente de execução foi encerrado')
+
+
+def test_execucao_interrompida():
+    executor = ExecutorPandasIsolado(pd.DataFrame({'Saida': [1.0]}), num_workers=1, timeout_s=0.5, memoria_mb=0)
+    try:
+        assert execucao_interrompida(executor.executar('import time; time.sleep(5)'))
+        assert not execucao_interrompida(executor.executar("df['Inexistente']"))
+        assert not execucao_interrompida(executor.executar("df['Saida'].sum()"))
+    finally:
+        executor.encerrar()
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='RLIMIT_AS só é aplicado no Linux')
+def test_limite_de_memoria_interrompe_e_limpa_a_sessao():
+    executor = ExecutorPandasIsolado(pd.DataFrame({'Saida': [1.0]}), num_workers=1, memoria_mb=1024)
+    try:
+        with executor.sessao():
+            executor.executar('x = 1')
+            saida = executor.executar('y = np.ones(4 * 1024 ** 3 // 8)\ny.sum()')
+            assert saida == 'MemoryError: o código excedeu o limite de 1024 MB'
+            assert execucao_interrompida(saida)
+            # O namespace parcial é descartado; o df continua disponível
+            assert executor.executar('x').startswith("NameError")
+            assert executor.executar("df['Saida'].sum()") == '1.0'
+    finally:
+        executor.encerrar()
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from infrastructure.shared_dataset import ConjuntoCompartilhado
+
+
+def falhar():
+    pytest.fail('o DataFrame não deveria ser recarregado')
+
+
+def test_obter_publica_uma_vez(tmp_path):
+    conjunto = ConjuntoCompartilhado(str(tmp_path))
+    df = pd.DataFrame({'Saida': [1.5, 2.0]})
+
+    assert conjunto.obter('a', lambda: df).equals(df)
+    assert conjunto.versao_atual() == 'a'
+    assert conjunto.obter('a', falhar).equals(df)
+
+
+def test_obter_volta_para_versao_ja_gravada_sem_recarregar(tmp_path):
+    conjunto = ConjuntoCompartilhado(str(tmp_path))
+    antigo = pd.DataFrame({'Saida': [1.0]})
+    conjunto.obter('a', lambda: antigo)
+    conjunto.obter('b', lambda: pd.DataFrame({'Saida': [2.0]}))
+
+    assert conjunto.obter('a', falhar).equals(antigo)
+    assert conjunto.versao_atual() == 'a'
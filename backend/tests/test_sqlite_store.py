@@ -0,0 +1,35 @@
+import pandas as pd
+
+from application.financial_service import FinancialAnalysisService
+from infrastructure.sqlite_store import ArmazemSQLite
+
+from conftest import BACKEND
+
+
+def test_gastos_por_titulo_agrupa_pelo_titulo_normalizado(tmp_path):
+    banco = ArmazemSQLite(str(tmp_path / 'extrato.db'))
+    df = pd.DataFrame({
+        'Titulo': ['IFOOD  SAO PAULO', 'ifood sao paulo ', 'Uber', 'UBER'],
+        'Categoria': ['Alimentação', 'Alimentação', 'Transporte', 'Transporte'],
+        'Entrada': [0.0, 0.0, 0.0, 0.0],
+        'Saida': [10.10, 20.20, 5.0, 5.0],
+    })
+    banco.garantir_fonte('fonte', lambda: [df])
+
+    por_titulo = banco.gastos_por_titulo(10)
+    assert por_titulo.to_dict('records') == [
+        {'Titulo': 'IFOOD  SAO PAULO', 'total': 3030, 'num': 2},
+        {'Titulo': 'UBER', 'total': 1000, 'num': 2},
+    ]
+    # A coluna normalizada fica só no banco
+    assert banco.ler().columns.tolist() == df.columns.tolist()
+
+
+def test_banco_e_memoria_dao_os_mesmos_resultados(tmp_path):
+    csv = str(BACKEND / 'transacoesC6_exemplo.csv')
+    memoria = FinancialAnalysisService(csv)
+    banco = FinancialAnalysisService(csv, banco=ArmazemSQLite(str(tmp_path / 'extrato.db')))
+
+    assert banco.obter_gastos_por_titulo(5) == memoria.obter_gastos_por_titulo(5)
+    assert banco.obter_transferencias_pessoais() == memoria.obter_transferencias_pessoais()
+    assert banco.df.equals(memoria.df)
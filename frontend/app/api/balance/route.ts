@@ -4,19 +4,30 @@ const FASTAPI_URL = process.env.FASTAPI_URL || 'http://localhost:8000'
 
 export async function GET(req: NextRequest) {
   try {
+    const ifNoneMatch = req.headers.get('if-none-match')
     const response = await fetch(`${FASTAPI_URL}/balance`, {
       method: 'GET',
       headers: {
         'Content-Type': 'application/json',
+        ...(ifNoneMatch ? { 'If-None-Match': ifNoneMatch } : {}),
       },
+      cache: 'no-store',
     })
 
+    // Dados não mudaram desde a última resposta recebida pelo cliente
+    const etag = response.headers.get('etag')
+    if (response.status === 304) {
+      return new Response(null, { status: 304, headers: etag ? { ETag: etag } : {} })
+    }
+
     if (!response.ok) {
       throw new Error(`Backend error: ${response.status}`)
     }
 
     const data = await response.json()
-    return Response.json(data)
+    return Response.json(data, {
+      headers: etag ? { ETag: etag, 'Cache-Control': 'no-cache' } : {},
+    })
   } catch (error) {
     console.error('[API] Erro ao buscar balance:', error)
     return Response.json(
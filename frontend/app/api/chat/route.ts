@@ -4,7 +4,7 @@ const FASTAPI_URL = process.env.FASTAPI_URL || 'http://localhost:8000'
 
 export async function POST(req: NextRequest) {
   try {
-    const { messages } = await req.json()
+    const { messages, sessionId } = await req.json()
     
     // Pegar a última mensagem do usuário
     const lastMessage = messages[messages.length - 1]
@@ -30,7 +30,7 @@ export async function POST(req: NextRequest) {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ message: userMessage }),
+        body: JSON.stringify({ message: userMessage, session_id: sessionId }),
         signal: controller.signal,
       })
       
@@ -51,6 +51,15 @@ export async function POST(req: NextRequest) {
     
     console.log('[API] Status da resposta:', response.status)
     
+    // Backend sobrecarregado: repassa o 429 com o Retry-After
+    if (response.status === 429) {
+      const retryAfter = response.headers.get('retry-after') ?? '5'
+      return Response.json(
+        { error: `Muitas perguntas em andamento. Tente novamente em ${retryAfter}s.` },
+        { status: 429, headers: { 'Retry-After': retryAfter } }
+      )
+    }
+    
     if (!response.ok) {
       const errorText = await response.text()
       console.error('[API] Erro do FastAPI:', errorText)
@@ -64,6 +73,8 @@ export async function POST(req: NextRequest) {
     }
     
     const decoder = new TextDecoder()
+    // Linha SSE incompleta do último pedaço recebido (tokens chegam fragmentados)
+    let buffer = ''
     
     // Criar um ReadableStream para repassar ao Vercel AI SDK
     const stream = new ReadableStream({
@@ -77,8 +88,9 @@ export async function POST(req: NextRequest) {
               break
             }
             
-            const chunk = decoder.decode(value, { stream: true })
-            const lines = chunk.split('\n')
+            buffer += decoder.decode(value, { stream: true })
+            const lines = buffer.split('\n')
+            buffer = lines.pop() ?? ''
             
             for (const line of lines) {
               if (line.startsWith('data: ')) {
@@ -99,6 +111,10 @@ export async function POST(req: NextRequest) {
                     return
                   }
                   
+                  if (parsed.status) {
+                    console.log('[API] Agente:', parsed.status)
+                  }
+                  
                   if (parsed.content) {
                     controller.enqueue(new TextEncoder().encode(parsed.content))
                   }
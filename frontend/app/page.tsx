@@ -16,8 +16,11 @@ interface BalanceData {
 }
 
 export default function Home() {
+  // Identifica a conversa no backend, que guarda o histórico resumido
+  const [sessionId] = useState(() => crypto.randomUUID())
   const { messages, input, handleInputChange, handleSubmit, isLoading, error } = useChat({
     api: '/api/chat',
+    body: { sessionId },
     onError: (error) => {
       console.error('Erro no chat:', error)
     },